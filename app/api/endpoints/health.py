@@ -1,7 +1,8 @@
 from fastapi import APIRouter
+from app.auth import user_cache
 
 router = APIRouter()
 
 @router.get("/health")
 async def health_check():
-    return {"status": "healthy"} 
\ No newline at end of file
+    return {"status": "healthy", "user_cache": user_cache.stats()} 
\ No newline at end of file
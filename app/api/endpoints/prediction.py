@@ -61,16 +61,19 @@ async def get_prediction_history(symbol: str):
     # This is a placeholder implementation
     history = [
         HistoryRecord(
+            id=1,
             date="2023-01-01",
             predicted="Up",
             actual="Up"
         ),
         HistoryRecord(
+            id=2,
             date="2023-01-02",
             predicted="Down",
             actual="Down"
         ),
         HistoryRecord(
+            id=3,
             date="2023-01-03",
             predicted="Up",
             actual="Down"
@@ -1,11 +1,20 @@
+import os
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db import get_db, User
+from app.core.config import settings
+from app.db import get_async_db, User
 from pydantic import BaseModel
 
 # JWT Configuration
@@ -17,6 +26,11 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# bcrypt releases the GIL, so hashing runs in parallel on these threads while
+# the event loop keeps serving requests; the pool size caps CPU spent on logins
+password_workers = settings.PASSWORD_HASH_WORKERS or min(4, os.cpu_count() or 1)
+password_executor = ThreadPoolExecutor(max_workers=password_workers, thread_name_prefix="password")
+
 # Pydantic models
 class Token(BaseModel):
     access_token: str
@@ -39,6 +53,70 @@ class UserInDB(UserBase):
     class Config:
         orm_mode = True
 
+class UserCache:
+    """
+    Bounded LRU cache of User rows resolved from access tokens, by email.
+
+    Cached rows are detached from their session, so only their loaded
+    columns are available. Entries live for `ttl` seconds, which bounds how
+    long a changed or deleted user keeps validating from the cache.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, User]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, email: str) -> Optional[User]:
+        with self._lock:
+            entry = self._data.get(email)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, user = entry
+            if expires_at <= time.monotonic():
+                del self._data[email]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(email)
+            self.hits += 1
+            return user
+
+    def set(self, email: str, user: User):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[email] = (time.monotonic() + self.ttl, user)
+            self._data.move_to_end(email)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, email: str):
+        with self._lock:
+            self._data.pop(email, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+user_cache = UserCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL_SECONDS)
+
 # Authentication functions
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -46,14 +124,28 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password, hashed_password):
+    """verify_password on the password pool, off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password):
+    """get_password_hash on the password pool, off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, get_password_hash, password)
+
 def get_user(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
 
-def authenticate_user(db: Session, email: str, password: str):
-    user = get_user(db, email)
+async def get_user_async(db: AsyncSession, email: str):
+    result = await db.execute(select(User).where(User.email == email).limit(1))
+    return result.scalars().first()
+
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    user = await get_user_async(db, email)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return False
     return user
 
@@ -67,7 +159,13 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    """
+    Resolve the User of a bearer access token.
+
+    Repeat tokens of a user are served from user_cache; the session only
+    checks out a connection on a cache miss.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -81,7 +179,12 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         token_data = TokenData(email=email)
     except JWTError:
         raise credentials_exception
-    user = get_user(db, email=token_data.email)
+    user = user_cache.get(token_data.email)
+    if user is not None:
+        return user
+    user = await get_user_async(db, email=token_data.email)
     if user is None:
         raise credentials_exception
+    db.expunge(user)
+    user_cache.set(token_data.email, user)
     return user 
\ No newline at end of file
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from collections import Counter
+from typing import List, Optional, Tuple
+
+from app.predictor import Predictor
+from app.schemas.prediction import PredictResponse
+
+class PredictionBatcher:
+    """
+    Coalesces concurrent single-symbol predictions into batched model calls.
+
+    Requests that arrive within `window_ms` of the first queued request (or
+    until `max_batch_size` requests are waiting) are scored together with
+    one Predictor.predict_batch call, and each caller gets its own result.
+    The model call runs in a worker thread, so a large batch doesn't stall
+    the event loop.
+    """
+
+    def __init__(self, window_ms: float = 2.0, max_batch_size: int = 64):
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # Requests taken off the queue and not yet answered (being collected or scored)
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+
+        # Batch-size histogram keyed by power-of-two bucket upper bound
+        self._histogram: Counter = Counter()
+        self._batches = 0
+        self._requests = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the background batching loop on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logging.info(
+            f"Prediction batcher started (window {self.window * 1000:.1f} ms, "
+            f"max batch {self.max_batch_size})"
+        )
+
+    async def stop(self):
+        """Stop the batching loop, failing any requests still waiting."""
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        waiting = self._pending
+        self._pending = []
+        while not self._queue.empty():
+            waiting.append(self._queue.get_nowait())
+        for _, future in waiting:
+            if not future.done():
+                future.set_exception(RuntimeError("Prediction batcher stopped"))
+
+    async def predict(self, symbol: str) -> Optional[PredictResponse]:
+        """Queue a symbol for the next batch and wait for its prediction."""
+        if not self.running:
+            # Not started (e.g. outside the app lifecycle): predict directly
+            return await asyncio.to_thread(Predictor.predict, symbol)
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((symbol, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[str, asyncio.Future]]:
+        """Wait for one request, then gather more until the window closes or the batch is full."""
+        loop = asyncio.get_running_loop()
+        # Kept on self so stop() can fail these if it cancels the loop mid-batch
+        self._pending = batch = [await self._queue.get()]
+        deadline = loop.time() + self.window
+
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            self._record(len(batch))
+
+            try:
+                results = await asyncio.to_thread(Predictor.predict_batch, [symbol for symbol, _ in batch])
+            except Exception as e:
+                logging.error(f"Batched prediction failed for {len(batch)} requests: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                self._pending = []
+                continue
+
+            for (_, future), result in zip(batch, results):
+                # The caller may have gone away (e.g. client disconnect)
+                if not future.done():
+                    future.set_result(result)
+            self._pending = []
+
+    def _record(self, size: int):
+        self._batches += 1
+        self._requests += size
+        self._histogram[1 << (size - 1).bit_length()] += 1
+
+    def stats(self) -> dict:
+        """Batch-size histogram and totals, for tuning the window and batch size."""
+        return {
+            "window_ms": self.window * 1000,
+            "max_batch_size": self.max_batch_size,
+            "batches": self._batches,
+            "requests": self._requests,
+            "mean_batch_size": self._requests / self._batches if self._batches else 0.0,
+            "batch_size_histogram": {
+                f"<={bound}": self._histogram[bound] for bound in sorted(self._histogram)
+            },
+        }
@@ -9,14 +9,62 @@ class Settings(BaseSettings):
     
     # Database settings
     DATABASE_URL: str = Field(..., env="DATABASE_URL")
+    # Async driver URL for async routes; derived from DATABASE_URL when empty
+    # (postgresql -> postgresql+asyncpg, sqlite -> sqlite+aiosqlite)
+    ASYNC_DATABASE_URL: str = Field("", env="ASYNC_DATABASE_URL")
+    # Connection pool (per engine, per worker process)
+    DB_POOL_SIZE: int = Field(5, env="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: int = Field(10, env="DB_MAX_OVERFLOW")
+    DB_POOL_TIMEOUT_SECONDS: float = Field(30.0, env="DB_POOL_TIMEOUT_SECONDS")
+    DB_POOL_RECYCLE_SECONDS: int = Field(1800, env="DB_POOL_RECYCLE_SECONDS")
+    DB_POOL_PRE_PING: bool = Field(True, env="DB_POOL_PRE_PING")
     
     # Firebase settings
     FIREBASE_PROJECT_ID: str = Field(..., env="FIREBASE_PROJECT_ID")
     FIREBASE_CLIENT_EMAIL: str = Field(..., env="FIREBASE_CLIENT_EMAIL")
     FIREBASE_PRIVATE_KEY: str = Field(..., env="FIREBASE_PRIVATE_KEY")
+    # Verified ID tokens kept in memory (each until its own exp)
+    FIREBASE_TOKEN_CACHE_SIZE: int = Field(10000, env="FIREBASE_TOKEN_CACHE_SIZE")
+    # How often token signing certificates are re-fetched in the background
+    FIREBASE_CERT_REFRESH_SECONDS: float = Field(3600.0, env="FIREBASE_CERT_REFRESH_SECONDS")
+    # Minimum time between refreshes triggered by tokens naming an unknown key
+    FIREBASE_CERT_ROTATION_MIN_INTERVAL_SECONDS: float = Field(60.0, env="FIREBASE_CERT_ROTATION_MIN_INTERVAL_SECONDS")
+    
+    # Password login (app/auth.py): bcrypt threads (0 = one per CPU, at most 4)
+    PASSWORD_HASH_WORKERS: int = Field(0, env="PASSWORD_HASH_WORKERS")
+    # Users resolved from access tokens, cached per worker
+    AUTH_USER_CACHE_SIZE: int = Field(10000, env="AUTH_USER_CACHE_SIZE")
+    AUTH_USER_CACHE_TTL_SECONDS: float = Field(60.0, env="AUTH_USER_CACHE_TTL_SECONDS")
     
     # News API settings
     NEWSAPI_KEY: str = Field(..., env="NEWSAPI_KEY")
+    NEWSAPI_BASE_URL: str = Field("https://newsapi.org/v2", env="NEWSAPI_BASE_URL")
+    NEWSAPI_TIMEOUT_SECONDS: float = Field(10.0, env="NEWSAPI_TIMEOUT_SECONDS")
+    NEWSAPI_MAX_CONNECTIONS: int = Field(10, env="NEWSAPI_MAX_CONNECTIONS")
+    
+    # Prediction model settings
+    MODEL_PATH: str = Field("ml/models/xgb_model.pkl", env="MODEL_PATH")
+    FEATURE_NAMES_PATH: str = Field("ml/models/feature_names.txt", env="FEATURE_NAMES_PATH")
+    FEATURES_DIR: str = Field("ml/data/processed", env="FEATURES_DIR")
+    # Feature panel from feature_engineering.py --panel; used instead of FEATURES_DIR when set
+    FEATURES_PANEL_PATH: str = Field("", env="FEATURES_PANEL_PATH")
+    
+    # Micro-batching of concurrent /predict requests
+    PREDICT_BATCH_WINDOW_MS: float = Field(2.0, env="PREDICT_BATCH_WINDOW_MS")
+    PREDICT_MAX_BATCH_SIZE: int = Field(64, env="PREDICT_MAX_BATCH_SIZE")
+    
+    # Prediction result cache
+    PREDICTION_CACHE_SIZE: int = Field(10000, env="PREDICTION_CACHE_SIZE")
+    PREDICTION_CACHE_TTL_SECONDS: int = Field(3600, env="PREDICTION_CACHE_TTL_SECONDS")
+    
+    # Write-behind logging of /predict results
+    PREDICTION_LOG_ENABLED: bool = Field(True, env="PREDICTION_LOG_ENABLED")
+    PREDICTION_LOG_FLUSH_MS: float = Field(200.0, env="PREDICTION_LOG_FLUSH_MS")
+    PREDICTION_LOG_BATCH_SIZE: int = Field(500, env="PREDICTION_LOG_BATCH_SIZE")
+    PREDICTION_LOG_QUEUE_SIZE: int = Field(10000, env="PREDICTION_LOG_QUEUE_SIZE")
+    PREDICTION_LOG_ENQUEUE_TIMEOUT_MS: float = Field(50.0, env="PREDICTION_LOG_ENQUEUE_TIMEOUT_MS")
+    PREDICTION_LOG_MAX_RETRIES: int = Field(3, env="PREDICTION_LOG_MAX_RETRIES")
+    PREDICTION_LOG_RETRY_BACKOFF_MS: float = Field(200.0, env="PREDICTION_LOG_RETRY_BACKOFF_MS")
     
     model_config = {
         "env_file": ".env",
@@ -1,15 +1,72 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import create_engine, inspect, insert, select, text, Column, Integer, String, Float, DateTime, Index, tuple_
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from datetime import datetime
+from typing import List, Optional
 from app.core.config import settings
 import logging
 
+# Async drivers for the sync DATABASE_URL drivers
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+def pool_options(url: str) -> dict:
+    """Connection pool settings from Settings (in-memory SQLite doesn't use a QueuePool)."""
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        # Explicit, as some drivers (e.g. aiosqlite) default to no pooling
+        "poolclass": AsyncAdaptedQueuePool if url.get_dialect().is_async else QueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+# libpq (psycopg2) query parameters that asyncpg takes under another name
+ASYNCPG_QUERY_PARAMS = {"sslmode": "ssl"}
+# libpq-only query parameters asyncpg rejects; set ASYNC_DATABASE_URL to configure them
+LIBPQ_ONLY_PARAMS = {
+    "connect_timeout", "sslcert", "sslkey", "sslrootcert", "sslcrl", "sslpassword", "sslcompression",
+    "application_name", "options", "gssencmode", "channel_binding", "keepalives",
+    "keepalives_idle", "keepalives_interval", "keepalives_count",
+}
+
+def async_driver_url(url: str) -> str:
+    """The async-driver form of a sync database URL, with libpq parameters translated for asyncpg."""
+    url = make_url(url)
+    url = url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+    if url.drivername == "postgresql+asyncpg":
+        dropped = sorted(key for key in url.query if key in LIBPQ_ONLY_PARAMS)
+        if dropped:
+            logging.warning(f"Async engine ignores libpq-only URL parameters: {', '.join(dropped)}")
+        url = url.set(query={
+            ASYNCPG_QUERY_PARAMS.get(key, key): value
+            for key, value in url.query.items()
+            if key not in LIBPQ_ONLY_PARAMS
+        })
+    return url.render_as_string(hide_password=False)
+
+def async_database_url(url: str) -> str:
+    """The async-driver form of a database URL (ASYNC_DATABASE_URL overrides it)."""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    return async_driver_url(url)
+
 # Create SQLAlchemy engine
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(settings.DATABASE_URL, **pool_options(settings.DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Async engine for async routes, created on first use so the async driver is
+# only needed by deployments that use it
+_async_engine: Optional[AsyncEngine] = None
+_async_sessionmaker: Optional[async_sessionmaker] = None
+
 # Models
 class User(Base):
     __tablename__ = "users"
@@ -23,31 +80,113 @@ class Prediction(Base):
     __tablename__ = "predictions"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    # Firebase uid of the requesting user (not a users.id)
+    user_id = Column(String)
     symbol = Column(String, index=True)
     date = Column(DateTime, default=datetime.utcnow)
     direction = Column(String)  # "Up", "Down", "Neutral"
     confidence = Column(Float)
     actual = Column(String, nullable=True)  # Can be updated later
 
+    # Serves per-user history newest first; id breaks ties between equal dates
+    __table_args__ = (
+        Index("ix_predictions_user_id_date", "user_id", date.desc(), id.desc()),
+    )
+
+def migrate_prediction_user_id(conn):
+    """
+    Convert predictions.user_id from the old INTEGER users.id foreign key to
+    the string Firebase uid it actually stores.
+
+    Postgres is altered in place (the composite index is rebuilt with the
+    column). SQLite can't alter a column type; its type affinity already
+    stores non-numeric uids as text, so it only gets a warning.
+    """
+    columns = {c["name"]: c for c in inspect(conn).get_columns("predictions")}
+    if "user_id" not in columns or isinstance(columns["user_id"]["type"], String):
+        return
+    if conn.dialect.name != "postgresql":
+        logging.warning(
+            "predictions.user_id is still INTEGER; recreate the table to store Firebase uids as strings"
+        )
+        return
+    for fk in inspect(conn).get_foreign_keys("predictions"):
+        if fk["constrained_columns"] == ["user_id"] and fk.get("name"):
+            conn.execute(text(f'ALTER TABLE predictions DROP CONSTRAINT "{fk["name"]}"'))
+    conn.execute(text("ALTER TABLE predictions ALTER COLUMN user_id TYPE VARCHAR USING user_id::varchar"))
+    logging.info("Migrated predictions.user_id to VARCHAR (Firebase uid)")
+
 def init_db():
     """Initialize the database by creating all tables."""
     try:
         Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            migrate_prediction_user_id(conn)
+        # create_all skips tables that already exist; add indexes added since
+        for index in Prediction.__table__.indexes:
+            index.create(bind=engine, checkfirst=True)
         logging.info("Database tables created successfully")
     except Exception as e:
         logging.error(f"Error creating database tables: {e}")
         raise
 
 def get_db():
-    """Get a database session."""
+    """
+    Get a database session.
+
+    Sessions are lazy: a pooled connection is checked out on the first query
+    and returned on close, so only handlers that query hold one.
+    """
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
 
-def log_prediction(db: Session, user_id: int, symbol: str, direction: str, confidence: float):
+def get_async_engine() -> AsyncEngine:
+    """The async engine, sharing the pool settings of the sync one."""
+    global _async_engine, _async_sessionmaker
+    if _async_engine is None:
+        url = async_database_url(settings.DATABASE_URL)
+        _async_engine = create_async_engine(url, **pool_options(url))
+        _async_sessionmaker = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+async def get_async_db():
+    """
+    Get an async database session, for async routes.
+
+    Like get_db, a connection is only checked out on the first query; unlike
+    get_db, FastAPI doesn't have to run it in the threadpool.
+    """
+    get_async_engine()
+    async with _async_sessionmaker() as db:
+        yield db
+
+async def dispose_engines():
+    """Close pooled connections of both engines (on shutdown)."""
+    engine.dispose()
+    if _async_engine is not None:
+        await _async_engine.dispose()
+
+def _pool_counts(pool) -> dict:
+    if not isinstance(pool, QueuePool):
+        return {"class": type(pool).__name__}
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+    }
+
+def pool_status() -> dict:
+    """Checked-out and idle connections of each engine's pool."""
+    status = {"sync": _pool_counts(engine.pool)}
+    if _async_engine is not None:
+        status["async"] = _pool_counts(_async_engine.pool)
+    return status
+
+def log_prediction(db: Session, user_id: str, symbol: str, direction: str, confidence: float):
     """Log a prediction to the database."""
     prediction = Prediction(
         user_id=user_id,
@@ -60,6 +199,67 @@ def log_prediction(db: Session, user_id: int, symbol: str, direction: str, confi
     db.refresh(prediction)
     return prediction
 
-def get_prediction_history(db: Session, user_id: int):
-    """Get prediction history for a user."""
-    return db.query(Prediction).filter(Prediction.user_id == user_id).order_by(Prediction.date.desc()).all() 
\ No newline at end of file
+def log_predictions(rows: List[dict]):
+    """
+    Insert many predictions with a single multi-row INSERT and one commit.
+
+    Args:
+        rows: Dicts with user_id, symbol, date, direction and confidence
+    """
+    if not rows:
+        return
+    with engine.begin() as conn:
+        conn.execute(insert(Prediction).values(rows))
+
+def encode_history_cursor(date: datetime, prediction_id: int) -> str:
+    """Cursor pointing just past a history row, for the `before` parameter."""
+    return f"{date.isoformat()}_{prediction_id}"
+
+def decode_history_cursor(cursor: str):
+    """Parse a cursor from encode_history_cursor; raises ValueError if malformed."""
+    date, _, prediction_id = cursor.rpartition("_")
+    return datetime.fromisoformat(date), int(prediction_id)
+
+def history_query(user_id: str, before: Optional[str] = None, limit: int = 50):
+    """Select statement for one page of a user's history (see get_prediction_history)."""
+    query = select(
+        Prediction.id, Prediction.date, Prediction.direction, Prediction.actual
+    ).where(Prediction.user_id == user_id)
+    if before is not None:
+        date, prediction_id = decode_history_cursor(before)
+        # Row-value comparison, so the index range scan starts right after the cursor
+        query = query.where(tuple_(Prediction.date, Prediction.id) < (date, prediction_id))
+    return query.order_by(Prediction.date.desc(), Prediction.id.desc()).limit(limit)
+
+def history_page(rows, limit: int):
+    """(rows, next_cursor) for a fetched history page."""
+    next_cursor = None
+    if len(rows) == limit:
+        next_cursor = encode_history_cursor(rows[-1].date, rows[-1].id)
+    return rows, next_cursor
+
+def get_prediction_history(db: Session, user_id: str, before: Optional[str] = None, limit: int = 50):
+    """
+    Get a page of prediction history for a user, newest first.
+
+    Uses keyset pagination over the (user_id, date DESC, id DESC) index, so
+    each page costs the same however deep it is, and selects only the
+    columns the history view needs instead of hydrating Prediction objects.
+
+    Args:
+        db: Database session
+        user_id: Firebase uid of the user whose predictions to return
+        before: Cursor of the last row of the previous page (None for the first page)
+        limit: Maximum number of rows
+
+    Returns:
+        (rows, next_cursor): rows with id, date, direction and actual;
+        next_cursor is None on the last page
+    """
+    rows = db.execute(history_query(user_id, before, limit)).all()
+    return history_page(rows, limit)
+
+async def get_prediction_history_async(db: AsyncSession, user_id: str, before: Optional[str] = None, limit: int = 50):
+    """Async variant of get_prediction_history, for an AsyncSession."""
+    rows = (await db.execute(history_query(user_id, before, limit))).all()
+    return history_page(rows, limit) 
\ No newline at end of file
@@ -1,8 +1,16 @@
 import os
 import json
+import time
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
 import firebase_admin
-from firebase_admin import auth as fb_auth, credentials
+import google.auth.transport
+from firebase_admin import _token_gen, auth as fb_auth, credentials
 from fastapi import Depends, HTTPException, Header
+from jose import JWTError, jwt
 import logging
 from app.core.config import settings
 
@@ -49,10 +57,203 @@ except Exception as e:
     logging.error(f"Error initializing Firebase Admin SDK: {e}")
     # Continue without crashing - we'll handle auth failures at runtime
 
+class VerifiedTokenCache:
+    """
+    Bounded LRU cache of verified ID token claims.
+
+    Keyed by a SHA-256 of the token, so raw tokens aren't kept in memory;
+    each entry expires at its token's own `exp` claim.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            claims = self._data.get(key)
+            if claims is None:
+                self.misses += 1
+                return None
+            if claims["exp"] <= time.time():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return claims
+
+    def set(self, key: str, claims: dict):
+        if self.maxsize <= 0 or "exp" not in claims:
+            return
+        with self._lock:
+            self._data[key] = claims
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._data)
+        lookups = self.hits + self.misses
+        return {
+            "size": size,
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+class PreloadedCertsRequest(google.auth.transport.Request):
+    """
+    google-auth transport that answers the ID token certificate URL from memory.
+
+    The certificates are fetched by refresh() (at startup and then
+    periodically in the background), so verifying a token never waits on
+    the network; other URLs, and the certificates before the first
+    successful refresh, go to the wrapped transport.
+    """
+
+    def __init__(self, delegate):
+        self._delegate = delegate
+        self._certs = None
+        self.key_ids = frozenset()
+        self.refreshed_at = None
+
+    def __call__(self, url, method="GET", body=None, headers=None, timeout=None, **kwargs):
+        if url == _token_gen.ID_TOKEN_CERT_URI and method == "GET" and self._certs is not None:
+            return self._certs
+        return self._delegate(url, method=method, body=body, headers=headers, timeout=timeout, **kwargs)
+
+    def refresh(self):
+        """Fetch the current signing certificates, bypassing the HTTP cache."""
+        response = self._delegate(
+            _token_gen.ID_TOKEN_CERT_URI, method="GET", headers={"Cache-Control": "no-cache"}, timeout=10
+        )
+        if response.status != 200:
+            raise RuntimeError(f"Certificate fetch failed with HTTP {response.status}")
+        self.key_ids = frozenset(json.loads(response.data.decode("utf-8")))
+        self._certs = response
+        self.refreshed_at = time.time()
+
+token_cache = VerifiedTokenCache(settings.FIREBASE_TOKEN_CACHE_SIZE)
+_certs_request: Optional[PreloadedCertsRequest] = None
+
+def install_cert_preloading() -> Optional[PreloadedCertsRequest]:
+    """
+    Route the SDK's certificate fetches through a PreloadedCertsRequest.
+
+    Returns None (leaving the SDK's own cached fetching in place) if Firebase
+    isn't initialized.
+    """
+    global _certs_request
+    if _certs_request is None:
+        try:
+            verifier = fb_auth._get_client(firebase_admin.get_app())._token_verifier
+        except Exception as e:
+            logging.warning(f"Firebase certificate preloading disabled: {e}")
+            return None
+        _certs_request = PreloadedCertsRequest(verifier.request)
+        verifier.request = _certs_request
+    return _certs_request
+
+def refresh_certs() -> bool:
+    """Fetch signing certificates now; returns whether it succeeded."""
+    request = install_cert_preloading()
+    if request is None:
+        return False
+    try:
+        request.refresh()
+    except Exception as e:
+        logging.error(f"Error refreshing Firebase certificates: {e}")
+        return False
+    return True
+
+_refresh_task: Optional[asyncio.Task] = None
+
+async def _refresh_loop():
+    while True:
+        await asyncio.sleep(settings.FIREBASE_CERT_REFRESH_SECONDS)
+        await asyncio.to_thread(refresh_certs)
+
+async def start_cert_refresh():
+    """Preload signing certificates, then keep refreshing them in the background."""
+    global _refresh_task
+    if await asyncio.to_thread(refresh_certs):
+        logging.info("Firebase signing certificates preloaded")
+    if _refresh_task is None and _certs_request is not None:
+        _refresh_task = asyncio.get_running_loop().create_task(_refresh_loop())
+
+async def stop_cert_refresh():
+    global _refresh_task
+    if _refresh_task is None:
+        return
+    _refresh_task.cancel()
+    try:
+        await _refresh_task
+    except asyncio.CancelledError:
+        pass
+    _refresh_task = None
+
+_rotation_refresh: Optional[asyncio.Future] = None
+_rotation_refreshed_at = 0.0
+
+async def _refresh_for_rotation():
+    """
+    Refresh certificates for a token with an unknown key.
+
+    The key id is read before the signature is checked, so anyone can send
+    one; refreshes are single-flight (concurrent callers share one fetch)
+    and at most one per FIREBASE_CERT_ROTATION_MIN_INTERVAL_SECONDS. Inside
+    that interval callers go straight on with the current certificates.
+    """
+    global _rotation_refresh, _rotation_refreshed_at
+    if _rotation_refresh is None or _rotation_refresh.done():
+        if time.monotonic() - _rotation_refreshed_at < settings.FIREBASE_CERT_ROTATION_MIN_INTERVAL_SECONDS:
+            return
+        _rotation_refreshed_at = time.monotonic()
+        _rotation_refresh = asyncio.ensure_future(asyncio.to_thread(refresh_certs))
+    # Shielded so a cancelled request doesn't cancel the fetch others wait on
+    await asyncio.shield(_rotation_refresh)
+
+def _has_unknown_key(token: str) -> bool:
+    """Whether the token is signed with a key the preloaded certificates don't have (rotation)."""
+    if _certs_request is None or _certs_request.refreshed_at is None:
+        return False
+    try:
+        kid = jwt.get_unverified_header(token).get("kid")
+    except JWTError:
+        return False
+    return kid is not None and kid not in _certs_request.key_ids
+
+def get_auth_stats() -> dict:
+    """Verified-token cache counters and certificate age."""
+    refreshed_at = _certs_request.refreshed_at if _certs_request else None
+    return {
+        "token_cache": token_cache.stats(),
+        "certs_age_seconds": time.time() - refreshed_at if refreshed_at else None,
+    }
+
 async def get_current_user(authorization: str = Header(...)):
     """
     Firebase authentication middleware.
     Verifies the Firebase ID token and returns user info.
+
+    Claims of verified tokens are cached until the token expires, so repeat
+    requests with the same token skip signature verification.
     """
     if not authorization.startswith("Bearer "):
         raise HTTPException(
@@ -61,9 +262,17 @@ async def get_current_user(authorization: str = Header(...)):
         )
     
     token = authorization.removeprefix("Bearer ").strip()
+    key = token_cache.key(token)
+    decoded = token_cache.get(key)
+    if decoded is not None:
+        return decoded
     
     try:
-        decoded = fb_auth.verify_id_token(token)
+        if _has_unknown_key(token):
+            # Keys may have rotated since the last refresh
+            await _refresh_for_rotation()
+        decoded = await asyncio.to_thread(fb_auth.verify_id_token, token)
+        token_cache.set(key, decoded)
         return decoded  # contains uid, email, etc.
     except Exception as e:
         logging.error(f"Firebase authentication error: {e}")
@@ -2,7 +2,9 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.api import api_router
+from app.auth import password_executor
 from app.core.config import settings
+from app.db import dispose_engines
 
 def create_application() -> FastAPI:
     application = FastAPI(
@@ -22,6 +24,11 @@ def create_application() -> FastAPI:
 
     application.include_router(api_router)
 
+    @application.on_event("shutdown")
+    async def shutdown():
+        password_executor.shutdown(wait=False, cancel_futures=True)
+        await dispose_engines()
+
     @application.get("/")
     async def root():
         return {"message": "Welcome to the Stock Predictor API"}
@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy.exc import DataError, DBAPIError, IntegrityError, OperationalError
+
+from app.db import log_predictions
+
+# Queued to stop the flush loop once everything before it is written
+_STOP = object()
+
+class PredictionLogger:
+    """
+    Write-behind logger for served predictions.
+
+    log() only appends the record to a bounded in-memory queue; a background
+    task writes queued records with one multi-row INSERT every `flush_ms`
+    or as soon as `max_batch_size` records are waiting. When the queue is
+    full, log() waits up to `enqueue_timeout_ms` for room (backpressure) and
+    then drops the record rather than stall the request. stop() writes
+    everything still queued.
+
+    Transient failures (a dropped connection, the database restarting) are
+    retried up to `max_retries` times with exponential backoff from
+    `retry_backoff_ms`. A batch rejected for its data is split until the bad
+    rows are isolated, so one bad row doesn't lose the rest; rows that can't
+    be written are kept (up to `max_queue_size`) in `rejected` for inspection.
+    """
+
+    def __init__(
+        self,
+        flush_ms: float = 200.0,
+        max_batch_size: int = 500,
+        max_queue_size: int = 10000,
+        enqueue_timeout_ms: float = 50.0,
+        max_retries: int = 3,
+        retry_backoff_ms: float = 200.0,
+    ):
+        self.flush_interval = flush_ms / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_queue_size = max(1, max_queue_size)
+        self.enqueue_timeout = enqueue_timeout_ms / 1000.0
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff = retry_backoff_ms / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.rejected: deque = deque(maxlen=self.max_queue_size)
+
+        self._queued = 0
+        self._written = 0
+        self._flushes = 0
+        self._dropped = 0
+        self._failed = 0
+        self._waited = 0
+        self._retries = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the background flush loop on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logging.info(
+            f"Prediction logger started (flush every {self.flush_interval * 1000:.0f} ms "
+            f"or {self.max_batch_size} rows, queue {self.max_queue_size})"
+        )
+
+    async def stop(self):
+        """Flush every queued record, then stop the loop."""
+        if not self._task:
+            return
+        # The queue is FIFO, so the loop sees the marker after every record
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def log(self, user_id: str, symbol: str, direction: str, confidence: float):
+        """Queue a prediction for the next flush; returns without touching the database."""
+        record = {
+            "user_id": user_id,
+            "symbol": symbol,
+            "date": datetime.utcnow(),
+            "direction": direction,
+            "confidence": confidence,
+        }
+        if not self.running:
+            # Not started (e.g. outside the app lifecycle): write directly
+            await asyncio.to_thread(self._write, [record])
+            return
+
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            # Backpressure: wait briefly for the writer to make room
+            self._waited += 1
+            try:
+                await asyncio.wait_for(self._queue.put(record), self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                self._dropped += 1
+                if self._dropped % 1000 == 1:
+                    logging.warning(f"Prediction log queue full, {self._dropped} predictions dropped so far")
+                return
+        self._queued += 1
+
+    async def _collect(self) -> List:
+        """Wait for one record, then gather more until the interval ends or the batch is full."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.flush_interval
+
+        while len(batch) < self.max_batch_size and batch[-1] is not _STOP:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            stopping = batch[-1] is _STOP
+            if stopping:
+                batch.pop()
+
+            if batch:
+                # Off the event loop, so a slow commit never delays requests
+                await asyncio.to_thread(self._write, batch)
+            if stopping:
+                return
+
+    def _write(self, records: List[dict]):
+        try:
+            self._insert(records)
+        except (DataError, IntegrityError) as e:
+            if len(records) > 1:
+                # One bad row fails the whole INSERT; write the halves separately
+                middle = len(records) // 2
+                self._write(records[:middle])
+                self._write(records[middle:])
+                return
+            self._reject(records, e)
+            return
+        except Exception as e:
+            self._reject(records, e)
+            return
+        self._written += len(records)
+        self._flushes += 1
+
+    def _insert(self, records: List[dict]):
+        """log_predictions(), retrying transient database errors with backoff."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                log_predictions(records)
+                return
+            except DBAPIError as e:
+                transient = isinstance(e, OperationalError) or e.connection_invalidated
+                if not transient or attempt == self.max_retries:
+                    raise
+                delay = self.retry_backoff * 2 ** attempt
+                self._retries += 1
+                logging.warning(f"Logging {len(records)} predictions failed, retrying in {delay:.2f}s: {e}")
+                # Runs on a worker thread; the flush loop waits and the queue absorbs new records
+                time.sleep(delay)
+
+    def _reject(self, records: List[dict], error: Exception):
+        self._failed += len(records)
+        self.rejected.extend(records)
+        logging.error(f"Failed to log {len(records)} predictions (kept in rejected): {error}")
+
+    def stats(self) -> dict:
+        """Queue depth and write totals, for tuning the flush interval and batch size."""
+        return {
+            "flush_ms": self.flush_interval * 1000,
+            "max_batch_size": self.max_batch_size,
+            "max_queue_size": self.max_queue_size,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "queued": self._queued,
+            "written": self._written,
+            "flushes": self._flushes,
+            "mean_flush_size": self._written / self._flushes if self._flushes else 0.0,
+            "waited_for_room": self._waited,
+            "dropped": self._dropped,
+            "retries": self._retries,
+            "failed": self._failed,
+            "rejected_kept": len(self.rejected),
+        }
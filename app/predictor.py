@@ -1,48 +1,338 @@
-import random
+import glob
+import hashlib
+import json
 import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
 from app.schemas.prediction import PredictResponse
 
+# Columns written by ml/scripts/feature_engineering.py that are not model inputs
+NON_FEATURE_COLUMNS = {"Open", "High", "Low", "Close", "Volume", "target"}
+
+# (symbol, feature_date, model_version)
+CacheKey = Tuple[str, str, str]
+
+class PredictionCache:
+    """
+    Bounded LRU cache of prediction responses with a per-entry TTL.
+
+    Keys are (symbol, feature_date, model_version), so a new feature row or
+    model naturally misses; clear() drops everything on reload.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[CacheKey, Tuple[float, PredictResponse]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: CacheKey) -> Optional[PredictResponse]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: CacheKey, value: PredictResponse):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
 class Predictor:
     model = None
-    
+    booster = None
+    model_version: Optional[str] = None
+    feature_names: List[str] = []
+
+    # In-memory feature store: one row per symbol, built once at load time
+    symbols: List[str] = []
+    symbol_index: Dict[str, int] = {}
+    features: Optional[np.ndarray] = None      # (n_symbols, n_features) float32
+    feature_dates: Optional[np.ndarray] = None  # date of the row held for each symbol
+    price_bands: Optional[np.ndarray] = None    # (n_symbols, 2) latest close and ATR
+
+    # Probabilities this close to 0.5 are reported as "Neutral"
+    NEUTRAL_MARGIN = 0.05
+
+    # Results only change when the feature row or the model does
+    cache = PredictionCache(
+        maxsize=settings.PREDICTION_CACHE_SIZE, ttl=settings.PREDICTION_CACHE_TTL_SECONDS
+    )
+
     @classmethod
     def load_model(cls):
         """
-        Load the prediction model into memory.
-        In a real app, this would load a trained ML model.
+        Load the XGBoost model and preload the latest feature row for every symbol.
+
+        After this call a prediction is a dictionary lookup plus one booster
+        call; nothing touches disk or pandas in the request path.
         """
-        logging.info("Loading prediction model...")
-        # Placeholder for model loading
-        cls.model = {"status": "loaded"}
-        logging.info("Prediction model loaded successfully")
-    
+        logging.info(f"Loading prediction model from {settings.MODEL_PATH}...")
+        if not os.path.exists(settings.MODEL_PATH):
+            raise FileNotFoundError(
+                f"Model artifact not found at {settings.MODEL_PATH}. "
+                "Run ml/create_mock_model.py (or train a model) first."
+            )
+
+        model = joblib.load(settings.MODEL_PATH)
+        with open(settings.FEATURE_NAMES_PATH) as f:
+            feature_names = [line.strip() for line in f if line.strip()]
+        with open(settings.MODEL_PATH, "rb") as f:
+            model_version = hashlib.sha1(f.read()).hexdigest()[:12]
+
+        cls.model = model
+        cls.booster = model.get_booster()
+        cls.model_version = model_version
+        cls.feature_names = feature_names
+        cls.load_features()
+        logging.info(
+            f"Prediction model {model_version} loaded successfully "
+            f"({len(feature_names)} features, {len(cls.symbol_index)} symbols)"
+        )
+
     @classmethod
-    def predict(cls, symbol: str) -> PredictResponse:
+    def load_features(cls, features_dir: Optional[str] = None):
+        """
+        Build the feature store from the processed feature files.
+
+        Uses the feature panel at settings.FEATURES_PANEL_PATH when one is
+        configured (and no directory is given), otherwise per-symbol files.
+
+        Args:
+            features_dir (str): Directory holding {SYMBOL}_features.csv files,
+                defaults to settings.FEATURES_DIR
+        """
+        if features_dir is None and settings.FEATURES_PANEL_PATH:
+            cls.load_panel(settings.FEATURES_PANEL_PATH)
+            return
+
+        features_dir = features_dir or settings.FEATURES_DIR
+        paths = sorted(glob.glob(os.path.join(features_dir, "*_features.csv")))
+
+        symbols, rows, dates, bands = [], [], [], []
+        for path in paths:
+            symbol = os.path.basename(path)[: -len("_features.csv")].upper()
+            try:
+                df = pd.read_csv(path, index_col="Date", parse_dates=True)
+            except Exception as e:
+                logging.error(f"Skipping feature file {path}: {e}")
+                continue
+            if df.empty:
+                continue
+
+            latest = df.iloc[-1]
+            symbols.append(symbol)
+            rows.append(cls._select_features(latest, symbol))
+            dates.append(df.index[-1].strftime("%Y-%m-%d"))
+            bands.append([latest.get("Close", np.nan), latest.get("atr", np.nan)])
+
+        n_features = len(cls.feature_names)
+        cls._set_features(
+            symbols,
+            np.array(rows, dtype=np.float32).reshape(len(rows), n_features),
+            dates,
+            np.array(bands, dtype=np.float64).reshape(len(bands), 2),
+        )
+        logging.info(f"Loaded features for {len(symbols)} symbols from {features_dir}")
+
+    @classmethod
+    def load_panel(cls, path: str):
+        """
+        Build the feature store from a (dates, symbols, columns) feature panel.
+
+        The panel is memory-mapped; only the latest complete row of each
+        symbol (recorded in the panel's .json sidecar) is read from disk.
+
+        Args:
+            path (str): Panel .npy file written by feature_engineering.py --panel
+        """
+        with open(os.path.splitext(path)[0] + ".json") as f:
+            meta = json.load(f)
+        panel = np.load(path, mmap_mode="r")
+
+        columns = meta["columns"]
+        last_valid = np.asarray(meta["last_valid"], dtype=np.int64)
+        keep = np.flatnonzero(last_valid >= 0)
+        # One fancy-indexed gather pulls just these rows out of the mapping
+        latest = np.asarray(panel[last_valid[keep], keep])
+
+        positions = [columns.index(col) for col in cls._feature_columns(columns, path)]
+        bands = [columns.index("Close"), columns.index("atr")]
+
+        cls._set_features(
+            [meta["symbols"][i].upper() for i in keep],
+            latest[:, positions].astype(np.float32),
+            [meta["dates"][i] for i in last_valid[keep]],
+            latest[:, bands].astype(np.float64),
+        )
+        logging.info(f"Loaded features for {len(keep)} symbols from panel {path}")
+
+    @classmethod
+    def _set_features(cls, symbols: List[str], features: np.ndarray, dates: List[str],
+                      price_bands: np.ndarray):
+        cls.symbols = symbols
+        cls.symbol_index = {symbol: i for i, symbol in enumerate(symbols)}
+        cls.features = np.ascontiguousarray(features)
+        cls.feature_dates = np.array(dates, dtype=object)
+        cls.price_bands = price_bands
+        cls.cache.clear()
+
+    @classmethod
+    def _feature_columns(cls, columns, source: str) -> List[str]:
+        """Names of the model's input columns among a feature file's columns."""
+        if all(name in columns for name in cls.feature_names):
+            return list(cls.feature_names)
+
+        # The model was trained on columns this file doesn't have by name
+        # (e.g. the mock model's feature_0..feature_N); feed engineered
+        # features positionally instead.
+        candidates = [col for col in columns if col not in NON_FEATURE_COLUMNS]
+        if len(candidates) < len(cls.feature_names):
+            raise ValueError(
+                f"{source} has {len(candidates)} feature columns, "
+                f"model expects {len(cls.feature_names)}"
+            )
+        logging.warning(f"Feature names not found for {source}; using columns positionally")
+        return candidates[: len(cls.feature_names)]
+
+    @classmethod
+    def _select_features(cls, row: pd.Series, symbol: str) -> np.ndarray:
+        """Pick the model's input columns out of a processed feature row."""
+        return row[cls._feature_columns(row.index, symbol)].to_numpy(dtype=np.float32)
+
+    @classmethod
+    def _predict_proba(cls, X: np.ndarray) -> np.ndarray:
+        """Return the probability of an up move for each row of X."""
+        proba = cls.booster.inplace_predict(X, validate_features=False)
+        if proba.ndim == 2:
+            proba = proba[:, -1]
+        return proba
+
+    @classmethod
+    def _to_response(cls, idx: int, prob_up: float) -> PredictResponse:
+        """Turn a model probability into the API response for a symbol."""
+        if abs(prob_up - 0.5) < cls.NEUTRAL_MARGIN:
+            direction = "Neutral"
+        else:
+            direction = "Up" if prob_up > 0.5 else "Down"
+
+        # Expected range: latest close +/- one average true range
+        close, atr = cls.price_bands[idx]
+        has_range = np.isfinite(close) and np.isfinite(atr)
+
+        return PredictResponse(
+            direction=direction,
+            confidence=max(prob_up, 1.0 - prob_up),
+            lower_range=float(close - atr) if has_range else None,
+            upper_range=float(close + atr) if has_range else None
+        )
+
+    @classmethod
+    def predict(cls, symbol: str) -> Optional[PredictResponse]:
         """
         Make a prediction for the given stock symbol.
-        This is a placeholder that returns random predictions.
-        In a production app, this would use an actual ML model.
+
+        Returns None if the symbol is invalid or has no features loaded.
         """
         if not cls.model:
             cls.load_model()
-            
+
         # Simple validation (could be more complex in real app)
         if not symbol or len(symbol) > 10:
             return None
-            
-        # Placeholder prediction logic
-        directions = ["Up", "Down", "Neutral"]
-        direction = random.choice(directions)
-        confidence = random.uniform(0.6, 0.95)
-        
-        # Only provide range estimates sometimes
-        has_range = random.random() > 0.3
-        lower_range = random.uniform(90, 98) if has_range else None
-        upper_range = random.uniform(102, 110) if has_range else None
-        
-        return PredictResponse(
-            direction=direction,
-            confidence=confidence,
-            lower_range=lower_range,
-            upper_range=upper_range
-        ) 
\ No newline at end of file
+
+        idx = cls.symbol_index.get(symbol.upper())
+        if idx is None:
+            return None
+
+        key = cls._cache_key(idx)
+        result = cls.cache.get(key)
+        if result is None:
+            prob_up = float(cls._predict_proba(cls.features[idx : idx + 1])[0])
+            result = cls._to_response(idx, prob_up)
+            cls.cache.set(key, result)
+        return result
+
+    @classmethod
+    def predict_batch(cls, symbols: List[str]) -> List[Optional[PredictResponse]]:
+        """
+        Make predictions for many symbols with a single booster call.
+
+        Returns one entry per input symbol, in order; entries are None for
+        symbols that are invalid or have no features loaded.
+        """
+        if not cls.model:
+            cls.load_model()
+
+        indices = [
+            cls.symbol_index.get(symbol.upper()) if symbol and len(symbol) <= 10 else None
+            for symbol in symbols
+        ]
+
+        responses: Dict[int, PredictResponse] = {}
+        misses = set()
+        for idx in set(indices) - {None}:
+            cached = cls.cache.get(cls._cache_key(idx))
+            if cached is None:
+                misses.add(idx)
+            else:
+                responses[idx] = cached
+
+        if misses:
+            # One gather and one vectorized booster call for every uncached symbol
+            rows = sorted(misses)
+            probs = cls._predict_proba(cls.features[rows])
+            for idx, p in zip(rows, probs):
+                result = cls._to_response(idx, float(p))
+                cls.cache.set(cls._cache_key(idx), result)
+                responses[idx] = result
+
+        return [responses.get(idx) if idx is not None else None for idx in indices]
+
+    @classmethod
+    def _cache_key(cls, idx: int) -> CacheKey:
+        return (cls.symbols[idx], cls.feature_dates[idx], cls.model_version)
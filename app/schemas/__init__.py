@@ -1,5 +1,6 @@
 from app.schemas.prediction import (
     PredictRequest, 
+    BatchPredictRequest, 
     PredictResponse, 
     Headline, 
     SentimentResponse, 
@@ -1,9 +1,12 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 
 class PredictRequest(BaseModel):
     symbol: str
 
+class BatchPredictRequest(BaseModel):
+    symbols: List[str] = Field(..., min_length=1, max_length=1000)
+
 class PredictResponse(BaseModel):
     direction: str        # "Up" / "Down" / "Neutral"
     confidence: float     # 0.0–1.0
@@ -19,6 +22,7 @@ class SentimentResponse(BaseModel):
     headlines: List[Headline]
 
 class HistoryRecord(BaseModel):
+    id: int
     date: str             # ISO date
     predicted: str
-    actual: str 
\ No newline at end of file
+    actual: Optional[str] # None until the outcome is known 
\ No newline at end of file
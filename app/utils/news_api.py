@@ -1,12 +1,135 @@
+import asyncio
+import threading
 import requests
+import httpx
 import logging
+from typing import Dict, List, Optional
 from app.core.config import settings
 from datetime import datetime, timedelta
 
 class NewsApiClient:
     """Client for accessing the News API securely using the stored API key."""
     
-    BASE_URL = "https://newsapi.org/v2"
+    BASE_URL = settings.NEWSAPI_BASE_URL
+    
+    # Define company names for better results
+    COMPANY_NAMES = {
+        'AAPL': 'Apple',
+        'MSFT': 'Microsoft',
+        'GOOGL': 'Google',
+        'AMZN': 'Amazon',
+        'META': 'Meta Facebook',
+        'TSLA': 'Tesla',
+        'NVDA': 'Nvidia',
+        # Add more mappings as needed
+    }
+    
+    # Keep-alive connection pools shared by every call
+    _session: Optional[requests.Session] = None
+    _async_client: Optional[httpx.AsyncClient] = None
+    _async_loop: Optional[asyncio.AbstractEventLoop] = None
+    _semaphore: Optional[asyncio.Semaphore] = None
+    
+    @classmethod
+    def _stock_news_params(cls, symbol, days_back, max_articles):
+        """Build the /everything query parameters for a stock."""
+        # Calculate date range
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days_back)
+        
+        # Build the query - use company name if available
+        company = cls.COMPANY_NAMES.get(symbol, symbol)
+        return {
+            'q': f"{company} stock OR {symbol} stock",
+            'from': start_date.strftime('%Y-%m-%d'),
+            'to': end_date.strftime('%Y-%m-%d'),
+            'language': 'en',
+            'sortBy': 'relevancy',
+            'pageSize': max_articles,
+            'apiKey': settings.NEWSAPI_KEY
+        }
+    
+    @staticmethod
+    def _market_news_params(max_articles):
+        return {
+            'category': 'business',
+            'language': 'en',
+            'pageSize': max_articles,
+            'apiKey': settings.NEWSAPI_KEY
+        }
+    
+    @staticmethod
+    def _articles(response):
+        """Extract the articles from a News API response (requests or httpx)."""
+        # Check for successful response
+        if response.status_code == 200:
+            data = response.json()
+            return data.get('articles', [])
+        logging.error(f"News API error: {response.status_code} - {response.text}")
+        return []
+    
+    @classmethod
+    def _get_session(cls) -> requests.Session:
+        if cls._session is None:
+            cls._session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=1, pool_maxsize=settings.NEWSAPI_MAX_CONNECTIONS
+            )
+            cls._session.mount("https://", adapter)
+            cls._session.mount("http://", adapter)
+        return cls._session
+    
+    @classmethod
+    def _get_async_client(cls) -> httpx.AsyncClient:
+        """Return the shared AsyncClient, creating it for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if cls._async_client is None or cls._async_loop is not loop:
+            # Connections belong to the loop that opened them; a new loop
+            # (e.g. a fresh asyncio.run) gets a fresh pool
+            if cls._async_client is not None:
+                cls._close_on_loop(cls._async_client, cls._async_loop)
+            cls._async_client = httpx.AsyncClient(
+                base_url=cls.BASE_URL,
+                timeout=settings.NEWSAPI_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=settings.NEWSAPI_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.NEWSAPI_MAX_CONNECTIONS,
+                ),
+            )
+            cls._semaphore = asyncio.Semaphore(settings.NEWSAPI_MAX_CONNECTIONS)
+            cls._async_loop = loop
+        return cls._async_client
+    
+    @staticmethod
+    def _close_on_loop(client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop):
+        """Close a pool left by another event loop, on that loop (its connections can't be used here)."""
+        if loop.is_running():
+            # Running in another thread
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        elif not loop.is_closed():
+            # A loop can't be run from a thread that is already running one
+            closer = threading.Thread(target=loop.run_until_complete, args=(client.aclose(),))
+            closer.start()
+            closer.join()
+        else:
+            logging.warning(
+                "News API connection pool outlived its event loop; await NewsApiClient.aclose() "
+                "before the loop ends to close its connections"
+            )
+    
+    @classmethod
+    async def aclose(cls):
+        """
+        Close the shared async connection pool.
+        
+        Call it on the loop that used the pool before that loop ends: on
+        application shutdown, or at the end of a script's asyncio.run().
+        """
+        if cls._async_client is not None:
+            await cls._async_client.aclose()
+            cls._async_client = None
+            cls._async_loop = None
+            cls._semaphore = None
     
     @classmethod
     def get_stock_news(cls, symbol, days_back=7, max_articles=10):
@@ -21,58 +144,63 @@ class NewsApiClient:
         Returns:
             list: List of news articles with title, description, url, etc.
         """
-        # Calculate date range
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days_back)
-        
-        # Format dates for API
-        from_date = start_date.strftime('%Y-%m-%d')
-        to_date = end_date.strftime('%Y-%m-%d')
-        
-        # Define company names for better results
-        company_names = {
-            'AAPL': 'Apple',
-            'MSFT': 'Microsoft',
-            'GOOGL': 'Google',
-            'AMZN': 'Amazon',
-            'META': 'Meta Facebook',
-            'TSLA': 'Tesla',
-            'NVDA': 'Nvidia',
-            # Add more mappings as needed
-        }
-        
-        # Build the query - use company name if available
-        company = company_names.get(symbol, symbol)
-        query = f"{company} stock OR {symbol} stock"
-        
         try:
             # Make request to News API
-            response = requests.get(
+            response = cls._get_session().get(
                 f"{cls.BASE_URL}/everything",
-                params={
-                    'q': query,
-                    'from': from_date,
-                    'to': to_date,
-                    'language': 'en',
-                    'sortBy': 'relevancy',
-                    'pageSize': max_articles,
-                    'apiKey': settings.NEWSAPI_KEY
-                },
-                timeout=10
+                params=cls._stock_news_params(symbol, days_back, max_articles),
+                timeout=settings.NEWSAPI_TIMEOUT_SECONDS
             )
-            
-            # Check for successful response
-            if response.status_code == 200:
-                data = response.json()
-                return data.get('articles', [])
-            else:
-                logging.error(f"News API error: {response.status_code} - {response.text}")
-                return []
+            return cls._articles(response)
                 
         except Exception as e:
             logging.error(f"Failed to fetch news data: {e}")
             return []
     
+    @classmethod
+    async def get_stock_news_async(cls, symbol, days_back=7, max_articles=10):
+        """
+        Async variant of get_stock_news on the shared keep-alive connection pool.
+        
+        At most NEWSAPI_MAX_CONNECTIONS requests are in flight at once; the
+        rest wait for a slot rather than timing out on the pool.
+        
+        Returns:
+            list: List of news articles, empty on any error
+        """
+        try:
+            client = cls._get_async_client()
+            async with cls._semaphore:
+                response = await client.get(
+                    "/everything",
+                    params=cls._stock_news_params(symbol, days_back, max_articles)
+                )
+            return cls._articles(response)
+        
+        except Exception as e:
+            logging.error(f"Failed to fetch news data for {symbol}: {e}")
+            return []
+    
+    @classmethod
+    async def get_stock_news_many(cls, symbols: List[str], days_back=7,
+                                  max_articles=10) -> Dict[str, list]:
+        """
+        Fetch news for many symbols concurrently.
+        
+        Args:
+            symbols (list): Stock symbols; duplicates are fetched once
+            days_back (int): How many days to look back
+            max_articles (int): Maximum number of articles per symbol
+            
+        Returns:
+            dict: symbol -> list of articles (empty for symbols that failed)
+        """
+        unique = list(dict.fromkeys(symbols))
+        results = await asyncio.gather(*(
+            cls.get_stock_news_async(symbol, days_back, max_articles) for symbol in unique
+        ))
+        return dict(zip(unique, results))
+    
     @classmethod
     def get_market_news(cls, max_articles=10):
         """
@@ -86,25 +214,28 @@ class NewsApiClient:
         """
         try:
             # Make request to News API
-            response = requests.get(
+            response = cls._get_session().get(
                 f"{cls.BASE_URL}/top-headlines",
-                params={
-                    'category': 'business',
-                    'language': 'en',
-                    'pageSize': max_articles,
-                    'apiKey': settings.NEWSAPI_KEY
-                },
-                timeout=10
+                params=cls._market_news_params(max_articles),
+                timeout=settings.NEWSAPI_TIMEOUT_SECONDS
             )
-            
-            # Check for successful response
-            if response.status_code == 200:
-                data = response.json()
-                return data.get('articles', [])
-            else:
-                logging.error(f"News API error: {response.status_code} - {response.text}")
-                return []
+            return cls._articles(response)
                 
         except Exception as e:
             logging.error(f"Failed to fetch news data: {e}")
-            return [] 
\ No newline at end of file
+            return []
+    
+    @classmethod
+    async def get_market_news_async(cls, max_articles=10):
+        """Async variant of get_market_news on the shared connection pool."""
+        try:
+            client = cls._get_async_client()
+            async with cls._semaphore:
+                response = await client.get(
+                    "/top-headlines", params=cls._market_news_params(max_articles)
+                )
+            return cls._articles(response)
+        
+        except Exception as e:
+            logging.error(f"Failed to fetch news data: {e}")
+            return []
@@ -1,11 +1,21 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
-from app.schemas import PredictRequest, PredictResponse, SentimentResponse, HistoryRecord
-from app.firebase_auth import get_current_user
-from app.db import get_db, init_db
+from typing import List, Optional
+from app.schemas import (
+    PredictRequest,
+    BatchPredictRequest,
+    PredictResponse,
+    SentimentResponse,
+    HistoryRecord,
+)
+from app.firebase_auth import get_current_user, start_cert_refresh, stop_cert_refresh, get_auth_stats
+from app.core.config import settings
+from app.db import get_async_db, init_db, dispose_engines, pool_status, get_prediction_history_async
 from app.predictor import Predictor
+from app.batcher import PredictionBatcher
+from app.prediction_log import PredictionLogger
 from app.sentiment import SentimentAnalyzer
+from app.utils.news_api import NewsApiClient
 import logging
 
 # Configure logging
@@ -27,12 +37,40 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Before"],  # /history pagination cursor
+)
+
+# Coalesces concurrent /predict calls into batched model calls
+batcher = PredictionBatcher(
+    window_ms=settings.PREDICT_BATCH_WINDOW_MS,
+    max_batch_size=settings.PREDICT_MAX_BATCH_SIZE,
+)
+
+# Writes served predictions to the database in batches, off the request path
+prediction_log = PredictionLogger(
+    flush_ms=settings.PREDICTION_LOG_FLUSH_MS,
+    max_batch_size=settings.PREDICTION_LOG_BATCH_SIZE,
+    max_queue_size=settings.PREDICTION_LOG_QUEUE_SIZE,
+    enqueue_timeout_ms=settings.PREDICTION_LOG_ENQUEUE_TIMEOUT_MS,
+    max_retries=settings.PREDICTION_LOG_MAX_RETRIES,
+    retry_backoff_ms=settings.PREDICTION_LOG_RETRY_BACKOFF_MS,
 )
 
 @app.on_event("startup")
-def startup():
+async def startup():
     init_db()                     # Create tables / connect to DB
     Predictor.load_model()        # Load ML model into memory
+    batcher.start()               # Start micro-batching loop
+    prediction_log.start()        # Start write-behind prediction logging
+    await start_cert_refresh()    # Preload Firebase token signing certificates
+
+@app.on_event("shutdown")
+async def shutdown():
+    await batcher.stop()
+    await stop_cert_refresh()
+    await prediction_log.stop()   # Flush predictions still queued
+    await dispose_engines()       # Close pooled DB connections
+    await NewsApiClient.aclose()  # Close pooled News API connections
 
 @app.get("/")
 async def root():
@@ -40,31 +78,63 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {"status": "healthy", "db_pool": pool_status(), "auth": get_auth_stats()}
 
 @app.post("/predict", response_model=PredictResponse)
-def predict(req: PredictRequest, db=Depends(get_db), user=Depends(get_current_user)):
-    result = Predictor.predict(req.symbol)
+async def predict(req: PredictRequest, user=Depends(get_current_user)):
+    result = await batcher.predict(req.symbol)
     if result is None:
         raise HTTPException(404, "Symbol not found")
     
-    # Log prediction to database (optional)
-    # db.log_prediction(user["uid"], req.symbol, result.direction, result.confidence)
+    # Log prediction to database (queued; written in the background)
+    if settings.PREDICTION_LOG_ENABLED:
+        await prediction_log.log(user.get("uid"), req.symbol, result.direction, result.confidence)
     
     return result
 
+@app.post("/predict/batch", response_model=List[PredictResponse])
+def predict_batch(req: BatchPredictRequest, user=Depends(get_current_user)):
+    results = Predictor.predict_batch(req.symbols)
+    missing = [symbol for symbol, result in zip(req.symbols, results) if result is None]
+    if missing:
+        raise HTTPException(404, f"Symbols not found: {', '.join(missing)}")
+    
+    return results
+
+@app.get("/predict/stats")
+async def predict_stats(user=Depends(get_current_user)):
+    return {"batcher": batcher.stats(), "cache": Predictor.cache.stats(), "log": prediction_log.stats()}
+
 @app.get("/sentiment", response_model=SentimentResponse)
-def sentiment(symbol: str, db=Depends(get_db), user=Depends(get_current_user)):
+def sentiment(symbol: str, user=Depends(get_current_user)):
     return SentimentAnalyzer.analyze(symbol)
 
 @app.get("/history", response_model=List[HistoryRecord])
-def history(db=Depends(get_db), user=Depends(get_current_user)):
+async def history(
+    response: Response,
+    before: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db=Depends(get_async_db),
+    user=Depends(get_current_user),
+):
     # Extract user ID from Firebase token
     user_id = user.get("uid")
     if not user_id:
         raise HTTPException(400, "Invalid user information")
     
-    return db.get_prediction_history(user_id)
+    try:
+        rows, next_cursor = await get_prediction_history_async(db, user_id, before=before, limit=limit)
+    except ValueError:
+        raise HTTPException(400, "Invalid history cursor")
+    
+    # Pass X-Next-Before back as ?before= to get the next (older) page
+    if next_cursor is not None:
+        response.headers["X-Next-Before"] = next_cursor
+    
+    return [
+        {"id": row.id, "date": row.date.isoformat(), "predicted": row.direction, "actual": row.actual}
+        for row in rows
+    ]
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,72 @@
+# ml/scripts/benchmark_indicators.py
+"""
+Benchmark the ta-based indicators against the vectorized NumPy kernel.
+
+Usage:
+    python scripts/benchmark_indicators.py [SYMBOL] [--panel N] [--repeat N]
+
+Times compute_features with both engines on one symbol's raw history, then
+the NumPy kernel on a synthetic (N, time) panel built from that history
+against N sequential ta runs.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import indicators
+from feature_engineering import compute_features, load_raw
+
+def _best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def _synthetic_panel(raw, n_symbols, seed=0):
+    """Scale the symbol's history by random factors to stand in for a universe."""
+    rng = np.random.default_rng(seed)
+    scale = rng.uniform(0.5, 2.0, size=(n_symbols, 1))
+    noise = 1 + rng.normal(0, 0.001, size=(n_symbols, len(raw)))
+    return {
+        col: raw[col].to_numpy(np.float64)[None, :] * (noise if col != "Volume" else 1) * scale
+        for col in ("Close", "High", "Low", "Volume")
+    }
+
+def benchmark(symbol="AAPL", panel=100, repeat=5):
+    raw = load_raw(symbol)
+    if raw is None:
+        return
+
+    ta_time = _best_of(lambda: compute_features(raw, engine="ta"), repeat)
+    np_time = _best_of(lambda: compute_features(raw, engine="numpy"), repeat)
+    print(f"\nSingle symbol ({len(raw)} bars), best of {repeat}:")
+    print(f"  ta:    {ta_time * 1000:8.2f} ms")
+    print(f"  numpy: {np_time * 1000:8.2f} ms  ({ta_time / np_time:.1f}x)")
+
+    data = _synthetic_panel(raw, panel)
+    frames = [
+        pd.DataFrame({col: values[i] for col, values in data.items()}, index=raw.index)
+        for i in range(panel)
+    ]
+    ta_panel = _best_of(lambda: [compute_features(f, engine="ta") for f in frames], 1)
+    np_panel = _best_of(
+        lambda: indicators.compute_indicators(data["Close"], data["High"], data["Low"], data["Volume"]),
+        repeat,
+    )
+    print(f"\nPanel ({panel} symbols x {len(raw)} bars):")
+    print(f"  ta (per symbol loop): {ta_panel * 1000:8.1f} ms")
+    print(f"  numpy (one call):     {np_panel * 1000:8.1f} ms  ({ta_panel / np_panel:.1f}x)")
+    print(f"  numpy throughput:     {panel * len(raw) / np_panel:,.0f} bars/sec")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ta vs NumPy indicators")
+    parser.add_argument("symbol", nargs="?", default="AAPL", help="Symbol whose raw data to use")
+    parser.add_argument("--panel", type=int, default=100, help="Symbols in the synthetic panel")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions")
+    args = parser.parse_args()
+
+    benchmark(args.symbol, panel=args.panel, repeat=args.repeat)
@@ -0,0 +1,204 @@
+# ml/scripts/data_store.py
+"""
+Storage backends for raw and processed market data.
+
+Two formats are supported:
+
+- "csv": data/raw/{symbol}.csv and data/processed/{symbol}_features.csv,
+  as written by yfinance / pandas (the default)
+- "npy": a directory per frame (data/raw/{symbol}/ and
+  data/processed/{symbol}_features/) holding one typed .npy file per column
+  plus Date.npy and columns.json. Loading memory-maps each column and wraps
+  it in a DataFrame without parsing or copying.
+
+The whole universe can also be stored as one feature panel
+(data/processed/panel.npy): a float64 array of shape (dates, symbols,
+columns) with a panel.json sidecar naming each axis. Each date is one
+contiguous (symbols, columns) block, so a reader can memory-map the file
+and gather the latest row of every symbol without loading the rest.
+
+Usage (migrate existing CSV files to the npy layout):
+    python scripts/data_store.py migrate [SYMBOL ...]
+"""
+import argparse
+import glob
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+FORMATS = ("csv", "npy")
+INDEX_NAME = "Date"
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+PANEL_PATH = "data/processed/panel.npy"
+
+def raw_path(symbol, storage="csv"):
+    return f"data/raw/{symbol}.csv" if storage == "csv" else f"data/raw/{symbol}"
+
+def processed_path(symbol, storage="csv"):
+    base = f"data/processed/{symbol}_features"
+    return f"{base}.csv" if storage == "csv" else base
+
+def write_npy(df, path):
+    """Write a Date-indexed frame as one contiguous .npy file per column."""
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, f"{INDEX_NAME}.npy"), df.index.values.astype("datetime64[ns]"))
+    for col in df.columns:
+        np.save(os.path.join(path, f"{col}.npy"), np.ascontiguousarray(df[col].to_numpy()))
+    with open(os.path.join(path, "columns.json"), "w") as f:
+        json.dump({
+            "index": INDEX_NAME,
+            "columns": list(df.columns),
+            "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()},
+            "rows": len(df),
+        }, f, indent=2)
+
+def read_npy(path, mmap=True):
+    """Load a frame written by write_npy; columns are memory-mapped when mmap is True."""
+    with open(os.path.join(path, "columns.json")) as f:
+        meta = json.load(f)
+    mode = "r" if mmap else None
+    index = pd.DatetimeIndex(np.load(os.path.join(path, f"{meta['index']}.npy")), name=meta["index"])
+    data = {col: np.load(os.path.join(path, f"{col}.npy"), mmap_mode=mode) for col in meta["columns"]}
+    # copy=False keeps one block per column, backed directly by the mapped files
+    return pd.DataFrame(data, index=index, columns=meta["columns"], copy=False)
+
+def clean_raw(raw):
+    """Parse dates and numeric columns of a raw price frame and index it by Date."""
+    # Convert Date to datetime
+    raw['Date'] = pd.to_datetime(raw['Date'])
+
+    # Ensure price columns are numeric
+    for col in PRICE_COLUMNS:
+        if col in raw.columns:
+            raw[col] = pd.to_numeric(raw[col], errors='coerce')
+
+    # Set Date as index
+    raw.set_index('Date', inplace=True)
+    return raw
+
+def read_raw_csv(path, **kwargs):
+    """Read a yfinance CSV; the stray ticker header row becomes NaN prices."""
+    return clean_raw(pd.read_csv(path, **kwargs))
+
+def read_raw(symbol, storage="csv"):
+    """Load raw OHLCV data for a symbol as a Date-indexed DataFrame."""
+    if storage == "csv":
+        return read_raw_csv(raw_path(symbol, storage))
+    return read_npy(raw_path(symbol, storage))
+
+def write_raw(df, symbol, storage="csv"):
+    """Save raw OHLCV data (Date as a column, as returned by yfinance) for a symbol."""
+    if storage == "csv":
+        df.to_csv(raw_path(symbol, storage), index=False)
+        return
+    df = df.copy()
+    if isinstance(df.columns, pd.MultiIndex):
+        # yfinance returns (Price, Ticker) columns; keep the price level
+        df.columns = df.columns.get_level_values(0)
+    df = df.set_index('Date')
+    df = df[[col for col in PRICE_COLUMNS if col in df.columns]].astype(np.float64)
+    write_npy(df, raw_path(symbol, storage))
+
+def read_processed(symbol, storage="csv"):
+    """Load processed features for a symbol as a Date-indexed DataFrame."""
+    if storage == "csv":
+        return pd.read_csv(
+            processed_path(symbol, storage),
+            index_col='Date',
+            parse_dates=True,
+            float_precision='round_trip',
+        )
+    return read_npy(processed_path(symbol, storage))
+
+def write_processed(df, symbol, storage="csv"):
+    """Save processed features for a symbol."""
+    if storage == "csv":
+        df.to_csv(processed_path(symbol, storage))
+    else:
+        write_npy(df, processed_path(symbol, storage))
+
+def list_symbols(storage="csv"):
+    """Symbols with raw data stored in the given format."""
+    if storage == "csv":
+        paths = glob.glob("data/raw/*.csv")
+        return sorted(os.path.basename(path)[:-len(".csv")] for path in paths)
+    paths = glob.glob("data/raw/*/columns.json")
+    return sorted(os.path.basename(os.path.dirname(path)) for path in paths)
+
+def panel_meta_path(path=PANEL_PATH):
+    return os.path.splitext(path)[0] + ".json"
+
+def create_panel(dates, symbols, columns, last_valid, path=PANEL_PATH):
+    """
+    Create an empty panel file and its sidecar, returning the writable memmap.
+
+    Args:
+        dates: datetime64 values for the first axis
+        symbols (list): Symbols for the second axis
+        columns (list): Column names for the third axis
+        last_valid (list): Per symbol, the index of the latest date with a
+            complete feature row (-1 if none)
+        path (str): Destination .npy file
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    values = np.lib.format.open_memmap(
+        path, mode="w+", dtype=np.float64, shape=(len(dates), len(symbols), len(columns))
+    )
+    with open(panel_meta_path(path), "w") as f:
+        json.dump({
+            "axes": ["date", "symbol", "column"],
+            "dates": [str(d) for d in np.asarray(dates, dtype="datetime64[D]")],
+            "symbols": list(symbols),
+            "columns": list(columns),
+            "last_valid": [int(i) for i in last_valid],
+        }, f)
+    return values
+
+def read_panel(path=PANEL_PATH, mmap=True):
+    """
+    Load a feature panel written by create_panel.
+
+    Returns:
+        tuple: (values of shape (dates, symbols, columns), metadata dict)
+    """
+    with open(panel_meta_path(path)) as f:
+        meta = json.load(f)
+    return np.load(path, mmap_mode="r" if mmap else None), meta
+
+def migrate(symbols=None):
+    """
+    Convert existing CSV data under data/ to the npy layout.
+
+    Rows without a valid date (the ticker header row yfinance writes) are
+    dropped; prices and volume are stored as float64.
+
+    Args:
+        symbols (list): Symbols to convert, defaults to every raw CSV file
+    """
+    if not symbols:
+        symbols = list_symbols("csv")
+
+    for symbol in symbols:
+        if os.path.exists(raw_path(symbol)):
+            raw = read_raw_csv(raw_path(symbol))
+            raw = raw[raw.index.notna()].astype(np.float64)
+            write_npy(raw, raw_path(symbol, "npy"))
+            print(f"Migrated {raw_path(symbol)} --> {raw_path(symbol, 'npy')} ({len(raw)} rows)")
+
+        if os.path.exists(processed_path(symbol)):
+            processed = read_processed(symbol)
+            write_npy(processed, processed_path(symbol, "npy"))
+            print(f"Migrated {processed_path(symbol)} --> {processed_path(symbol, 'npy')} "
+                  f"({len(processed)} rows)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Market data storage utilities")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = subparsers.add_parser("migrate", help="Convert CSV data to the npy layout")
+    migrate_parser.add_argument("symbols", nargs="*", help="Symbols to migrate (default: all)")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        migrate(args.symbols)
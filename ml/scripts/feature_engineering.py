@@ -1,108 +1,478 @@
 # ml/scripts/feature_engineering.py
 import pandas as pd
 import ta  # Technical Analysis library
-import os, sys
+import os, io, json
+import argparse
+import warnings
 import numpy as np
 
-def featurize(symbol):
+from indicator_state import IndicatorState
+import indicators
+import data_store
+from data_store import PRICE_COLUMNS, clean_raw
+
+def load_raw(symbol, storage="csv"):
     """
-    Generate technical indicators and features for a stock symbol.
-    
+    Load the raw price history for a symbol.
+
     Args:
         symbol (str): The stock ticker symbol (e.g., 'AAPL')
-    
+        storage (str): Storage format, "csv" or "npy"
+
     Returns:
-        pd.DataFrame: DataFrame with calculated features
+        pd.DataFrame: Raw OHLCV data indexed by Date, or None on failure
     """
     # Ensure raw data directory exists
-    if not os.path.exists(f"data/raw/{symbol}.csv"):
+    if not os.path.exists(data_store.raw_path(symbol, storage)):
         print(f"Error: Raw data file for {symbol} not found. Run ingest_data.py first.")
         return None
-    
+
     # Read the raw data and fix data types
     try:
-        raw = pd.read_csv(f"data/raw/{symbol}.csv")
-        
-        # Convert Date to datetime
-        raw['Date'] = pd.to_datetime(raw['Date'])
-        
-        # Ensure price columns are numeric
-        numeric_cols = ['Open', 'High', 'Low', 'Close', 'Volume']
-        for col in numeric_cols:
-            if col in raw.columns:
-                raw[col] = pd.to_numeric(raw[col], errors='coerce')
-        
-        # Set Date as index
-        raw.set_index('Date', inplace=True)
-        
+        raw = data_store.read_raw(symbol, storage)
         print(f"Successfully loaded data for {symbol} with shape {raw.shape}")
+        return raw
     except Exception as e:
         print(f"Error processing data: {e}")
         return None
-    
+
+ENGINES = ("numpy", "ta")
+# IndicatorState reproduces the ta / pandas kernels bit for bit, so csv
+# features (which incremental runs append to) are always computed with them
+INCREMENTAL_ENGINE = "ta"
+
+FEATURE_COLUMNS = [
+    'daily_return', 'rsi14', 'sma20', 'sma50', 'sma200', 'ema20',
+    'macd', 'macd_signal', 'macd_diff',
+    'bb_high', 'bb_low', 'bb_mid', 'bb_width', 'atr', 'obv',
+]
+
+# Scale-free features that get per-day ranks and z-scores across the universe
+CROSS_SECTIONAL_COLUMNS = ['daily_return', 'rsi14', 'bb_width']
+
+def compute_features(raw, engine="numpy"):
+    """
+    Calculate all technical indicators and the target over a raw price frame.
+
+    Args:
+        raw (pd.DataFrame): Raw OHLCV data indexed by Date
+        engine (str): "numpy" for the vectorized kernel in indicators.py, or
+            "ta" for the reference implementation (what the incremental
+            pipeline reproduces bit for bit)
+
+    Returns:
+        pd.DataFrame: Raw columns plus features and target (rows with NaNs included)
+    """
+    if engine == "numpy":
+        columns = indicators.compute_indicators(
+            raw["Close"].to_numpy(np.float64),
+            raw["High"].to_numpy(np.float64),
+            raw["Low"].to_numpy(np.float64),
+            raw["Volume"].to_numpy(np.float64),
+        )
+        df = pd.concat([raw, pd.DataFrame(columns, index=raw.index)], axis=1)
+        df['target'] = np.where(df['Close'].shift(-1) > df['Close'], 1, 0)
+        return df
+    if engine != "ta":
+        raise ValueError(f"Unknown indicator engine: {engine}")
+
     df = raw.copy()
-    
+
     # Calculate daily returns
     df['daily_return'] = df['Close'].pct_change()
-    
+
     # Momentum Indicators
     # RSI (Relative Strength Index)
     df["rsi14"] = ta.momentum.RSIIndicator(df["Close"], window=14).rsi()
-    
+
     # Moving Averages
     # SMA (Simple Moving Average)
     df["sma20"] = df["Close"].rolling(20).mean()
     df["sma50"] = df["Close"].rolling(50).mean()
     df["sma200"] = df["Close"].rolling(200).mean()
-    
+
     # EMA (Exponential Moving Average)
     df["ema20"] = df["Close"].ewm(span=20, adjust=False).mean()
-    
+
     # Trend Indicators
     # MACD (Moving Average Convergence Divergence)
     macd = ta.trend.MACD(df["Close"])
     df["macd"] = macd.macd()
     df["macd_signal"] = macd.macd_signal()
     df["macd_diff"] = macd.macd_diff()
-    
+
     # Bollinger Bands
     bollinger = ta.volatility.BollingerBands(df["Close"], window=20, window_dev=2)
     df["bb_high"] = bollinger.bollinger_hband()
     df["bb_low"] = bollinger.bollinger_lband()
     df["bb_mid"] = bollinger.bollinger_mavg()
     df["bb_width"] = (df["bb_high"] - df["bb_low"]) / df["bb_mid"]
-    
+
     # Volatility Indicators
     # Average True Range (ATR)
     df["atr"] = ta.volatility.AverageTrueRange(df["High"], df["Low"], df["Close"], window=14).average_true_range()
-    
+
     # Volume Indicators
     # On-Balance Volume (OBV)
     df["obv"] = ta.volume.OnBalanceVolumeIndicator(df["Close"], df["Volume"]).on_balance_volume()
-    
+
     # Create target variable (next day's movement direction)
     df['target'] = np.where(df['Close'].shift(-1) > df['Close'], 1, 0)
-    
+
+    return df
+
+def featurize(symbol, incremental=False, storage="csv", engine=None):
+    """
+    Generate technical indicators and features for a stock symbol.
+
+    Args:
+        symbol (str): The stock ticker symbol (e.g., 'AAPL')
+        incremental (bool): Only process bars appended to the raw file since
+            the last run (see featurize_incremental)
+        storage (str): Storage format for raw and processed data, "csv" or "npy"
+        engine (str): Indicator implementation, "numpy" or "ta"; defaults to
+            INCREMENTAL_ENGINE for csv storage (so incremental runs can append
+            to the output) and "numpy" otherwise
+
+    Returns:
+        pd.DataFrame: DataFrame with calculated features
+    """
+    if incremental:
+        if storage == "csv":
+            return featurize_incremental(symbol)
+        print("Incremental mode supports csv storage only, running full featurization")
+
+    raw = load_raw(symbol, storage)
+    if raw is None:
+        return None
+
+    if engine is None:
+        engine = INCREMENTAL_ENGINE if storage == "csv" else "numpy"
+    df = compute_features(raw, engine)
+
     # Create directory for processed data if it doesn't exist
     os.makedirs("data/processed", exist_ok=True)
-    
+
     # Drop rows with NaN values and save
     df_clean = df.dropna()
-    df_clean.to_csv(f"data/processed/{symbol}_features.csv")
-    
+    data_store.write_processed(df_clean, symbol, storage)
+    if storage == "csv" and os.path.exists(_state_path(symbol)):
+        # The processed file was rewritten, so saved offsets no longer apply
+        os.remove(_state_path(symbol))
+
     # Print summary
     feature_count = len(df_clean.columns) - len(raw.columns) - 1  # Subtract original columns and target
-    print(f"Features saved --> data/processed/{symbol}_features.csv")
+    print(f"Features saved --> {data_store.processed_path(symbol, storage)}")
     print(f"Created {feature_count} new features")
     print(f"Data shape: {df_clean.shape}")
     print(f"Target distribution: {df_clean['target'].value_counts(normalize=True).apply(lambda x: f'{x:.2%}')}")
-    
+
+    return df_clean
+
+def load_panel_raw(symbols, storage="csv"):
+    """
+    Load raw prices for many symbols aligned on the union of their dates.
+
+    Args:
+        symbols (list): Ticker symbols
+        storage (str): Storage format, "csv" or "npy"
+
+    Returns:
+        tuple: (dates, symbols loaded, {column: (symbols, dates) float64 array})
+    """
+    frames = {}
+    for symbol in symbols:
+        try:
+            raw = data_store.read_raw(symbol, storage)
+        except Exception as e:
+            print(f"Skipping {symbol}: {e}")
+            continue
+        # Drop the yfinance ticker row and any other undated rows
+        frames[symbol] = raw[raw.index.notna()]
+
+    dates = np.unique(np.concatenate(
+        [frame.index.values.astype("datetime64[ns]") for frame in frames.values()]
+    )) if frames else np.array([], dtype="datetime64[ns]")
+
+    prices = {col: np.full((len(frames), len(dates)), np.nan) for col in PRICE_COLUMNS}
+    for i, frame in enumerate(frames.values()):
+        positions = np.searchsorted(dates, frame.index.values.astype("datetime64[ns]"))
+        for col in PRICE_COLUMNS:
+            prices[col][i, positions] = frame[col].to_numpy(np.float64)
+    return dates, list(frames), prices
+
+def cross_sectional_features(columns):
+    """
+    Per-day percentile ranks and z-scores of CROSS_SECTIONAL_COLUMNS across symbols.
+
+    Args:
+        columns (dict): column name -> (symbols, dates) array
+
+    Returns:
+        dict: {col}_cs_rank and {col}_cs_z arrays of the same shape
+    """
+    result = {}
+    for col in CROSS_SECTIONAL_COLUMNS:
+        values = columns[col]
+        # rank(axis=1) on the (dates, symbols) view ranks each day across symbols
+        ranks = pd.DataFrame(values.T).rank(axis=1, pct=True).to_numpy().T
+        with warnings.catch_warnings(), np.errstate(invalid="ignore", divide="ignore"):
+            # Dates where no symbol has a value yet are all-NaN slices
+            warnings.simplefilter("ignore", RuntimeWarning)
+            mean = np.nanmean(values, axis=0)
+            std = np.nanstd(values, axis=0)
+            zscores = (values - mean) / std
+        result[f"{col}_cs_rank"] = ranks
+        result[f"{col}_cs_z"] = np.where(std > 0, zscores, np.nan)
+    return result
+
+def featurize_panel(symbols=None, storage="csv", path=data_store.PANEL_PATH):
+    """
+    Featurize a whole universe in one pass into a single memory-mappable panel.
+
+    Raw prices are aligned into (symbols, dates) arrays and every indicator
+    is computed for all symbols at once with the NumPy kernel, followed by
+    cross-sectional ranks and z-scores. The panel has shape (dates, symbols,
+    columns) with NaN where a symbol has no data; columns are the raw
+    prices, FEATURE_COLUMNS, the cross-sectional columns and target (NaN
+    where the next close is unknown).
+
+    Args:
+        symbols (list): Ticker symbols, defaults to every raw file in `storage`
+        storage (str): Storage format of the raw data, "csv" or "npy"
+        path (str): Output .npy file (metadata goes to the matching .json)
+
+    Returns:
+        tuple: (panel memmap, metadata dict), or None if nothing was loaded
+    """
+    symbols = symbols or data_store.list_symbols(storage)
+    dates, symbols, prices = load_panel_raw(symbols, storage)
+    if not symbols:
+        print("Error: no raw data found. Run ingest_data.py first.")
+        return None
+    print(f"Loaded {len(symbols)} symbols over {len(dates)} dates")
+
+    close = prices['Close']
+    # Index where each symbol's history begins (RSI and ATR warm up from there)
+    has_close = ~np.isnan(close)
+    start = np.where(has_close.any(axis=1), has_close.argmax(axis=1), len(dates))
+
+    columns = dict(prices)
+    columns.update(indicators.compute_indicators(
+        close, prices['High'], prices['Low'], prices['Volume'], start=start
+    ))
+    columns.update(cross_sectional_features(columns))
+    next_close = np.concatenate([close[:, 1:], np.full((len(symbols), 1), np.nan)], axis=1)
+    with np.errstate(invalid="ignore"):
+        columns['target'] = np.where(
+            np.isnan(next_close) | ~has_close, np.nan, (next_close > close).astype(np.float64)
+        )
+
+    # Latest date with a complete feature row, as featurize's dropna would keep
+    complete = np.all([~np.isnan(columns[col]) for col in PRICE_COLUMNS + FEATURE_COLUMNS], axis=0)
+    last_valid = np.where(
+        complete.any(axis=1), len(dates) - 1 - complete[:, ::-1].argmax(axis=1), -1
+    )
+
+    panel = data_store.create_panel(dates, symbols, list(columns), last_valid, path)
+    for c, values in enumerate(columns.values()):
+        panel[:, :, c] = values.T
+    panel.flush()
+
+    print(f"Panel saved --> {path} (shape {panel.shape})")
+    print(f"Symbols with a complete latest row: {int((last_valid >= 0).sum())}/{len(symbols)}")
+    return data_store.read_panel(path)
+
+def _state_path(symbol):
+    return f"data/processed/{symbol}_state.json"
+
+def _last_line(data):
+    """Return (offset, line) of the last newline-terminated line in a bytes buffer."""
+    start = data.rstrip(b"\n").rfind(b"\n") + 1
+    return start, data[start:]
+
+def _save_state(symbol, state, layout, raw_bytes, raw_end, processed_bytes, processed_end):
+    """
+    Snapshot indicator state plus where the raw and processed files end.
+
+    raw_bytes / processed_bytes are the trailing bytes of each file, ending at
+    byte offsets raw_end / processed_end; only their last line is kept.
+    """
+    raw_start, raw_last_line = _last_line(raw_bytes)
+    processed_start, processed_last_line = _last_line(processed_bytes)
+
+    with open(_state_path(symbol), "w") as f:
+        json.dump({
+            "layout": layout,
+            "raw_offset": raw_end,
+            "raw_last_line": raw_last_line.decode(),
+            "processed_offset": processed_end - (len(processed_bytes) - processed_start),
+            "processed_last_line": processed_last_line.decode(),
+            "indicators": state.to_dict(),
+        }, f)
+
+def _bootstrap_incremental(symbol):
+    """Full recompute, then replay the raw history to capture indicator state."""
+    df_clean = featurize(symbol, engine=INCREMENTAL_ENGINE)
+    if df_clean is None:
+        return None
+
+    raw = pd.read_csv(f"data/raw/{symbol}.csv")
+    # Remember how columns were parsed and written so appended rows match exactly
+    layout = {
+        "raw_columns": list(raw.columns),
+        "raw_text_columns": [col for col in raw.columns if raw[col].dtype == object],
+        "dtypes": {col: str(dtype) for col, dtype in df_clean.dtypes.items()},
+    }
+    raw = clean_raw(raw)
+
+    state = IndicatorState()
+    for close, high, low, volume in zip(
+        raw['Close'].tolist(), raw['High'].tolist(), raw['Low'].tolist(), raw['Volume'].tolist()
+    ):
+        state.update(close, high, low, volume)
+
+    with open(f"data/raw/{symbol}.csv", "rb") as f:
+        raw_bytes = f.read()
+    with open(f"data/processed/{symbol}_features.csv", "rb") as f:
+        processed_bytes = f.read()
+    _save_state(symbol, state, layout, raw_bytes, len(raw_bytes), processed_bytes, len(processed_bytes))
+    print(f"Incremental state saved --> {_state_path(symbol)}")
+    return df_clean
+
+def featurize_incremental(symbol):
+    """
+    Append features for bars added to data/raw/{symbol}.csv since the last run.
+
+    Indicator state (EMA values, rolling windows, OBV, Wilder averages) is kept
+    in data/processed/{symbol}_state.json and only the new raw lines are parsed.
+    The output is bit-identical to a full recompute. Falls back to a full
+    recompute when there is no state yet or the raw or processed file was
+    rewritten since.
+
+    Args:
+        symbol (str): The stock ticker symbol (e.g., 'AAPL')
+
+    Returns:
+        pd.DataFrame: The newly appended feature rows
+    """
+    raw_path = f"data/raw/{symbol}.csv"
+    processed_path = f"data/processed/{symbol}_features.csv"
+    if not os.path.exists(raw_path):
+        print(f"Error: Raw data file for {symbol} not found. Run ingest_data.py first.")
+        return None
+    if not (os.path.exists(_state_path(symbol)) and os.path.exists(processed_path)):
+        print(f"No incremental state for {symbol}, running full featurization")
+        return _bootstrap_incremental(symbol)
+
+    with open(_state_path(symbol)) as f:
+        saved = json.load(f)
+
+    # Read only what was appended after the last processed raw line
+    raw_last_line = saved["raw_last_line"].encode()
+    with open(raw_path, "rb") as f:
+        f.seek(max(saved["raw_offset"] - len(raw_last_line), 0))
+        tail = f.read()
+    if not tail.startswith(raw_last_line) or len(raw_last_line) == 0:
+        print(f"Raw history for {symbol} changed, running full featurization")
+        return _bootstrap_incremental(symbol)
+
+    # The processed file must still end with the line the state recorded
+    processed_last_line = saved["processed_last_line"].encode()
+    with open(processed_path, "rb") as f:
+        f.seek(saved["processed_offset"])
+        if f.read() != processed_last_line or len(processed_last_line) == 0:
+            print(f"Processed features for {symbol} changed, running full featurization")
+            return _bootstrap_incremental(symbol)
+
+    new_text = tail[len(raw_last_line):].decode()
+    if not new_text.strip():
+        print(f"{symbol} features are up to date")
+        return pd.DataFrame()
+
+    layout = saved["layout"]
+    new_raw = clean_raw(pd.read_csv(
+        io.StringIO(new_text),
+        names=layout["raw_columns"],
+        dtype={col: str for col in layout["raw_text_columns"]},
+    ))
+    if new_raw[PRICE_COLUMNS].isna().any().any() or new_raw.index.isna().any():
+        print(f"New bars for {symbol} contain missing values, running full featurization")
+        return _bootstrap_incremental(symbol)
+
+    state = IndicatorState.from_dict(saved["indicators"])
+    prev_close = state.prev_close
+    rows = [
+        state.update(close, high, low, volume)
+        for close, high, low, volume in zip(
+            new_raw['Close'].tolist(), new_raw['High'].tolist(),
+            new_raw['Low'].tolist(), new_raw['Volume'].tolist()
+        )
+    ]
+    df = pd.concat([new_raw, pd.DataFrame(rows, index=new_raw.index)], axis=1)
+    df['target'] = np.where(df['Close'].shift(-1) > df['Close'], 1, 0)
+    df_clean = df.dropna().astype(layout["dtypes"])
+
+    # The last processed row's target was unknown until now (only if it is the
+    # last raw bar; during indicator warm-up it may not have been written)
+    last_line = saved["processed_last_line"]
+    raw_last_date = saved["raw_last_line"].split(",", 1)[0]
+    processed_last_date = last_line.split(",", 1)[0]
+    if pd.to_datetime(processed_last_date, errors="coerce") == pd.to_datetime(raw_last_date):
+        previous_target = int(new_raw['Close'].iloc[0] > prev_close)
+        last_line = last_line.rstrip("\n").rsplit(",", 1)[0] + f",{previous_target}\n"
+
+    processed_tail = last_line.encode() + df_clean.to_csv(header=False).encode()
+    with open(processed_path, "r+b") as f:
+        f.truncate(saved["processed_offset"])
+        f.seek(saved["processed_offset"])
+        f.write(processed_tail)
+        processed_end = f.tell()
+
+    _save_state(
+        symbol, state, layout,
+        tail, saved["raw_offset"] + len(tail) - len(raw_last_line),
+        processed_tail, processed_end,
+    )
+    print(f"Appended {len(df_clean)} rows --> {processed_path}")
     return df_clean
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python feature_engineering.py <SYMBOL>")
-        sys.exit(1)
-        
-    symbol = sys.argv[1]
-    featurize(symbol)
+    parser = argparse.ArgumentParser(description="Generate technical features for a symbol")
+    parser.add_argument(
+        "symbols",
+        nargs="*",
+        help="Stock ticker symbol(s) (e.g., AAPL); with --panel defaults to every raw file",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only process bars appended since the last run",
+    )
+    parser.add_argument(
+        "--storage",
+        choices=data_store.FORMATS,
+        default="csv",
+        help="Storage format for raw and processed data",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default=None,
+        help=f"Indicator implementation (default: {INCREMENTAL_ENGINE} for csv storage, "
+             "numpy for npy; ignored in incremental mode)",
+    )
+    parser.add_argument(
+        "--panel",
+        action="store_true",
+        help=f"Featurize all symbols together into {data_store.PANEL_PATH}",
+    )
+    args = parser.parse_args()
+
+    if args.panel:
+        featurize_panel(args.symbols, storage=args.storage)
+    elif not args.symbols:
+        parser.error("a symbol is required unless --panel is given")
+    else:
+        for symbol in args.symbols:
+            featurize(symbol, incremental=args.incremental, storage=args.storage, engine=args.engine)
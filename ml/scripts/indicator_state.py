@@ -0,0 +1,309 @@
+# ml/scripts/indicator_state.py
+"""
+Streaming (bar-by-bar) versions of the indicators built in feature_engineering.py.
+
+Each class keeps exactly the running state pandas / ta keep internally, and
+performs the same floating point operations in the same order, so feeding
+bars one at a time reproduces a full-history recompute bit for bit:
+
+- Ewm mirrors pandas' ``ewm(adjust=False).mean()`` recursion
+- RollingMean / RollingVar mirror pandas' online Kahan / Welford rolling kernels
+- IndicatorState combines them into the full feature row
+
+State serializes to plain JSON (floats round-trip exactly through repr).
+"""
+import math
+from collections import deque
+
+import numpy as np
+
+NaN = float("nan")
+
+def _isnan(x):
+    return x != x
+
+class Ewm:
+    """Exponentially weighted mean, ``series.ewm(com=com, adjust=False).mean()``."""
+
+    def __init__(self, com, min_periods=0):
+        self.alpha = 1.0 / (1.0 + com)
+        self.old_wt_factor = 1.0 - self.alpha
+        self.min_periods = max(min_periods, 1)
+        self.weighted = NaN
+        self.old_wt = 1.0
+        self.nobs = 0
+        self.started = False
+
+    @classmethod
+    def from_span(cls, span, min_periods=0):
+        return cls((span - 1) / 2.0, min_periods)
+
+    @classmethod
+    def from_alpha(cls, alpha, min_periods=0):
+        return cls(1.0 / alpha - 1, min_periods)
+
+    def update(self, x):
+        is_observation = not _isnan(x)
+        if not self.started:
+            self.started = True
+            self.weighted = x
+            self.nobs = int(is_observation)
+        else:
+            self.nobs += is_observation
+            if not _isnan(self.weighted):
+                # ignore_na=False: missing values still decay the old weight
+                self.old_wt *= self.old_wt_factor
+                if is_observation:
+                    if self.weighted != x:
+                        self.weighted = self.old_wt * self.weighted + self.alpha * x
+                        self.weighted /= self.old_wt + self.alpha
+                    self.old_wt = 1.0
+            elif is_observation:
+                self.weighted = x
+        return self.weighted if self.nobs >= self.min_periods else NaN
+
+class RollingMean:
+    """Fixed-window mean, ``series.rolling(window).mean()``."""
+
+    def __init__(self, window, min_periods=None):
+        self.window = window
+        self.min_periods = max(window if min_periods is None else min_periods, 1)
+        self.values = deque(maxlen=window)
+        self.nobs = 0
+        self.sum_x = 0.0
+        self.neg_ct = 0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.num_consecutive_same_value = 0
+        self.prev_value = NaN
+
+    def _add(self, val):
+        if _isnan(val):
+            return
+        self.nobs += 1
+        y = val - self.compensation_add
+        t = self.sum_x + y
+        self.compensation_add = t - self.sum_x - y
+        self.sum_x = t
+        if math.copysign(1.0, val) < 0:
+            self.neg_ct += 1
+        if val == self.prev_value:
+            self.num_consecutive_same_value += 1
+        else:
+            self.num_consecutive_same_value = 1
+        self.prev_value = val
+
+    def _remove(self, val):
+        if _isnan(val):
+            return
+        self.nobs -= 1
+        y = -val - self.compensation_remove
+        t = self.sum_x + y
+        self.compensation_remove = t - self.sum_x - y
+        self.sum_x = t
+        if math.copysign(1.0, val) < 0:
+            self.neg_ct -= 1
+
+    def update(self, x):
+        if len(self.values) == self.window:
+            self._remove(self.values[0])
+        self.values.append(x)
+        self._add(x)
+
+        if self.nobs >= self.min_periods and self.nobs > 0:
+            result = self.sum_x / self.nobs
+            if self.num_consecutive_same_value >= self.nobs:
+                result = self.prev_value
+            elif self.neg_ct == 0 and result < 0:
+                result = 0.0
+            elif self.neg_ct == self.nobs and result > 0:
+                result = 0.0
+            return result
+        return NaN
+
+class RollingVar:
+    """Fixed-window variance, ``series.rolling(window).var(ddof=ddof)``."""
+
+    def __init__(self, window, min_periods=None, ddof=1):
+        self.window = window
+        self.min_periods = max(window if min_periods is None else min_periods, 1)
+        self.ddof = ddof
+        self.values = deque(maxlen=window)
+        self.nobs = 0.0
+        self.mean_x = 0.0
+        self.ssqdm_x = 0.0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.num_consecutive_same_value = 0
+        self.prev_value = NaN
+        self.started = False
+
+    def _add(self, val):
+        if _isnan(val):
+            return
+        self.nobs += 1
+        if val == self.prev_value:
+            self.num_consecutive_same_value += 1
+        else:
+            self.num_consecutive_same_value = 1
+        self.prev_value = val
+        # Welford's method with Kahan summation
+        prev_mean = self.mean_x - self.compensation_add
+        y = val - self.compensation_add
+        t = y - self.mean_x
+        self.compensation_add = t + self.mean_x - y
+        self.mean_x = self.mean_x + t / self.nobs
+        self.ssqdm_x = self.ssqdm_x + (val - prev_mean) * (val - self.mean_x)
+
+    def _remove(self, val):
+        if _isnan(val):
+            return
+        self.nobs -= 1
+        if self.nobs:
+            prev_mean = self.mean_x - self.compensation_remove
+            y = val - self.compensation_remove
+            t = y - self.mean_x
+            self.compensation_remove = t + self.mean_x - y
+            self.mean_x = self.mean_x - t / self.nobs
+            self.ssqdm_x = self.ssqdm_x - (val - prev_mean) * (val - self.mean_x)
+        else:
+            self.mean_x = 0.0
+            self.ssqdm_x = 0.0
+
+    def update(self, x):
+        if not self.started:
+            self.started = True
+            self.prev_value = x
+        if len(self.values) == self.window:
+            self._remove(self.values[0])
+        self.values.append(x)
+        self._add(x)
+
+        if self.nobs >= self.min_periods and self.nobs > self.ddof:
+            if self.nobs == 1 or self.num_consecutive_same_value >= self.nobs:
+                return 0.0
+            return self.ssqdm_x / (self.nobs - self.ddof)
+        return NaN
+
+class IndicatorState:
+    """
+    Running state for every column written by feature_engineering.featurize.
+
+    update() takes one raw bar and returns that bar's feature values.
+    """
+
+    RSI_WINDOW = 14
+    ATR_WINDOW = 14
+    BB_WINDOW = 20
+    BB_DEV = 2
+
+    def __init__(self):
+        self.rsi_up = Ewm.from_alpha(1 / self.RSI_WINDOW, self.RSI_WINDOW)
+        self.rsi_down = Ewm.from_alpha(1 / self.RSI_WINDOW, self.RSI_WINDOW)
+        self.sma20 = RollingMean(20)
+        self.sma50 = RollingMean(50)
+        self.sma200 = RollingMean(200)
+        self.ema20 = Ewm.from_span(20)
+        self.macd_fast = Ewm.from_span(12, 12)
+        self.macd_slow = Ewm.from_span(26, 26)
+        self.macd_sign = Ewm.from_span(9, 9)
+        self.bb_var = RollingVar(self.BB_WINDOW, ddof=0)
+
+        self.n_rows = 0
+        self.prev_close = NaN          # previous raw close (may be NaN)
+        self.prev_filled_close = NaN   # previous forward-filled close
+        self.tr_seed = []              # true ranges until the first ATR value
+        self.atr = 0.0
+        self.obv = 0.0
+
+    def update(self, close, high, low, volume):
+        """Advance the state by one bar and return the bar's feature values."""
+        row = {}
+
+        # Daily return (pct_change with forward fill)
+        filled = self.prev_filled_close if _isnan(close) else close
+        row["daily_return"] = filled / self.prev_filled_close - 1
+        self.prev_filled_close = filled
+
+        # RSI (Wilder smoothing of gains and losses)
+        diff = close - self.prev_close
+        up = diff if diff > 0 else 0.0
+        down = -(diff if diff < 0 else 0.0)
+        emaup = self.rsi_up.update(up)
+        emadn = self.rsi_down.update(down)
+        row["rsi14"] = 100.0 if emadn == 0 else 100 - (100 / (1 + emaup / emadn))
+
+        # Moving averages
+        row["sma20"] = self.sma20.update(close)
+        row["sma50"] = self.sma50.update(close)
+        row["sma200"] = self.sma200.update(close)
+        row["ema20"] = self.ema20.update(close)
+
+        # MACD
+        macd = self.macd_fast.update(close) - self.macd_slow.update(close)
+        macd_signal = self.macd_sign.update(macd)
+        row["macd"] = macd
+        row["macd_signal"] = macd_signal
+        row["macd_diff"] = macd - macd_signal
+
+        # Bollinger Bands (population standard deviation)
+        var = self.bb_var.update(close)
+        mstd = NaN if _isnan(var) else (math.sqrt(var) if var >= 0 else 0.0)
+        mavg = row["sma20"]
+        row["bb_high"] = mavg + self.BB_DEV * mstd
+        row["bb_low"] = mavg - self.BB_DEV * mstd
+        row["bb_mid"] = mavg
+        row["bb_width"] = (row["bb_high"] - row["bb_low"]) / mavg
+
+        # ATR (true range seeded with a plain mean, then Wilder smoothing)
+        ranges = [high - low, abs(high - self.prev_close), abs(low - self.prev_close)]
+        ranges = [r for r in ranges if not _isnan(r)]
+        true_range = max(ranges) if ranges else NaN
+        if self.n_rows < self.ATR_WINDOW:
+            self.tr_seed.append(true_range)
+            if self.n_rows == self.ATR_WINDOW - 1:
+                seed = np.array(self.tr_seed, dtype=np.float64)
+                mask = np.isnan(seed)
+                count = mask.size - mask.sum()
+                seed[mask] = 0
+                self.atr = float(seed.sum() / count) if count else NaN
+        else:
+            self.atr = (self.atr * (self.ATR_WINDOW - 1) + true_range) / float(self.ATR_WINDOW)
+        row["atr"] = self.atr
+
+        # OBV (cumulative signed volume, NaN volumes contribute nothing)
+        signed = -volume if close < self.prev_close else volume
+        if not _isnan(signed):
+            self.obv += signed
+        row["obv"] = NaN if _isnan(signed) else self.obv
+
+        self.prev_close = close
+        self.n_rows += 1
+        return row
+
+    def to_dict(self):
+        def dump(obj):
+            state = dict(vars(obj))
+            if "values" in state:
+                state["values"] = list(state["values"])
+            return state
+
+        state = {
+            name: dump(value) if hasattr(value, "update") else value
+            for name, value in vars(self).items()
+        }
+        return state
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls()
+        for name, value in data.items():
+            current = getattr(state, name)
+            if hasattr(current, "update"):
+                for attr, attr_value in value.items():
+                    if attr == "values":
+                        attr_value = deque(attr_value, maxlen=current.window)
+                    setattr(current, attr, attr_value)
+            else:
+                setattr(state, name, value)
+        return state
@@ -0,0 +1,254 @@
+# ml/scripts/indicators.py
+"""
+Vectorized NumPy implementations of the technical indicators used by
+feature_engineering.py.
+
+Every function accepts either a 1-D series (time,) or a 2-D panel
+(symbols, time) and works along the last axis, so a whole universe can be
+processed in one call. Results match the ``ta`` / pandas implementations to
+floating point rounding:
+
+- exponential averages (EMA, MACD, RSI and ATR smoothing) are evaluated in
+  blocks of EMA_BLOCK steps with a lower-triangular weight matrix, so the
+  recursion costs a few matrix products instead of a Python loop per step
+- rolling means and standard deviations use centred running sums
+
+Interior gaps are forward filled for the exponential averages; leading NaNs
+mark bars before a symbol's history starts.
+"""
+import numpy as np
+
+EMA_BLOCK = 64
+
+def _as_2d(x):
+    x = np.asarray(x, dtype=np.float64)
+    return (x[None, :], True) if x.ndim == 1 else (x, False)
+
+def _squeeze(result, squeeze):
+    if isinstance(result, dict):
+        return {key: value[0] if squeeze else value for key, value in result.items()}
+    return result[0] if squeeze else result
+
+def _first_valid(x):
+    """Index and value of the first non-NaN entry in each row (row length and 0 if none)."""
+    valid = ~np.isnan(x)
+    first = np.where(valid.any(axis=1), valid.argmax(axis=1), x.shape[1])
+    value = x[np.arange(x.shape[0]), np.minimum(first, x.shape[1] - 1)]
+    return first, np.where(first < x.shape[1], value, 0.0)
+
+def _ffill(x):
+    """Forward fill NaNs along each row; leading NaNs are kept."""
+    idx = np.where(np.isnan(x), 0, np.arange(x.shape[1]))
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    return x[np.arange(x.shape[0])[:, None], idx]
+
+def _shift(x, periods=1):
+    out = np.full_like(x, np.nan)
+    out[:, periods:] = x[:, :-periods]
+    return out
+
+def _ema_recursive(x, alpha, y0):
+    """
+    y[t] = (1 - alpha) * y[t-1] + alpha * x[t] for NaN-free x, with y[-1] = y0.
+
+    Evaluated block by block: inside a block of L steps the recursion is a
+    product with a fixed L x L weight matrix plus the decayed carry.
+    """
+    n_rows, n_steps = x.shape
+    out = np.empty_like(x)
+    if n_steps == 0:
+        return out
+
+    block = min(EMA_BLOCK, n_steps)
+    decay = 1.0 - alpha
+    j = np.arange(block)
+    lags = j[:, None] - j[None, :]
+    weights = np.where(lags >= 0, alpha * decay ** np.maximum(lags, 0), 0.0)
+    carry_decay = decay ** (j + 1)
+
+    carry = np.asarray(y0, dtype=np.float64)
+    for s in range(0, n_steps, block):
+        chunk = x[:, s:s + block]
+        n = chunk.shape[1]
+        y = chunk @ weights[:n, :n].T + carry[:, None] * carry_decay[:n]
+        out[:, s:s + n] = y
+        carry = y[:, -1]
+    return out
+
+def ewm_mean(x, alpha, min_periods=0):
+    """``Series.ewm(alpha=alpha, min_periods=min_periods, adjust=False).mean()``."""
+    x, squeeze = _as_2d(x)
+    _, start_value = _first_valid(x)
+
+    # Leading NaNs take the first value, so the recursion starts exactly there
+    filled = _ffill(x)
+    filled = np.where(np.isnan(filled), start_value[:, None], filled)
+    out = _ema_recursive(filled, alpha, start_value)
+
+    nobs = np.cumsum(~np.isnan(x), axis=1)
+    out[nobs < max(min_periods, 1)] = np.nan
+    return _squeeze(out, squeeze)
+
+def ema(x, span, min_periods=0):
+    """``Series.ewm(span=span, adjust=False).mean()``."""
+    return ewm_mean(x, 2.0 / (span + 1.0), min_periods)
+
+def _rolling_sums(x, window):
+    """Windowed count, sum and sum of squares of non-NaN values, centred per row."""
+    valid = ~np.isnan(x)
+    # Centring on each row's first value keeps the running sums small
+    _, ref = _first_valid(x)
+    centred = np.where(valid, x - ref[:, None], 0.0)
+
+    def windowed(v):
+        total = np.cumsum(v, axis=1)
+        total[:, window:] -= total[:, :-window].copy()
+        return total
+
+    return windowed(valid.astype(np.float64)), windowed(centred), windowed(centred ** 2), ref
+
+def rolling_mean(x, window):
+    """``Series.rolling(window).mean()``."""
+    x, squeeze = _as_2d(x)
+    count, total, _, ref = _rolling_sums(x, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = np.where(count >= window, total / count + ref[:, None], np.nan)
+    return _squeeze(out, squeeze)
+
+def rolling_std(x, window, ddof=1):
+    """``Series.rolling(window).std(ddof=ddof)``."""
+    x, squeeze = _as_2d(x)
+    count, total, total_sq, _ = _rolling_sums(x, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = (total_sq - total * total / count) / (count - ddof)
+    out = np.where(count >= window, np.sqrt(np.maximum(var, 0.0)), np.nan)
+    return _squeeze(out, squeeze)
+
+def pct_change(x):
+    """``Series.pct_change()`` (forward filling gaps, as pandas does by default)."""
+    x, squeeze = _as_2d(x)
+    filled = _ffill(x)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = filled / _shift(filled) - 1
+    return _squeeze(out, squeeze)
+
+def rsi(close, window=14, start=None):
+    """``ta.momentum.RSIIndicator(close, window).rsi()``."""
+    close, squeeze = _as_2d(close)
+    diff = close - _shift(close)
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+    if start is not None:
+        before = np.arange(close.shape[1]) < np.asarray(start)[:, None]
+        up[before] = np.nan
+        down[before] = np.nan
+
+    emaup = ewm_mean(up, 1.0 / window, window)
+    emadn = ewm_mean(down, 1.0 / window, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = np.where(emadn == 0, 100.0, 100 - (100 / (1 + emaup / emadn)))
+    return _squeeze(out, squeeze)
+
+def macd(close, window_slow=26, window_fast=12, window_sign=9):
+    """``ta.trend.MACD``: returns (macd, signal, diff)."""
+    close, squeeze = _as_2d(close)
+    line = ema(close, window_fast, window_fast) - ema(close, window_slow, window_slow)
+    signal = ema(line, window_sign, window_sign)
+    return _squeeze(line, squeeze), _squeeze(signal, squeeze), _squeeze(line - signal, squeeze)
+
+def bollinger(close, window=20, window_dev=2):
+    """``ta.volatility.BollingerBands``: returns (high, low, mid)."""
+    close, squeeze = _as_2d(close)
+    mid = rolling_mean(close, window)
+    std = rolling_std(close, window, ddof=0)
+    return (
+        _squeeze(mid + window_dev * std, squeeze),
+        _squeeze(mid - window_dev * std, squeeze),
+        _squeeze(mid, squeeze),
+    )
+
+def true_range(high, low, close):
+    high, squeeze = _as_2d(high)
+    low, _ = _as_2d(low)
+    close, _ = _as_2d(close)
+    prev_close = _shift(close)
+    # fmax skips NaNs like DataFrame.max(axis=1)
+    out = np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+    return _squeeze(out, squeeze)
+
+def atr(high, low, close, window=14, start=None):
+    """
+    ``ta.volatility.AverageTrueRange(...).average_true_range()``.
+
+    The first value (at start + window - 1) is the plain mean of the first
+    `window` true ranges; earlier bars are 0 as in ``ta``.
+    """
+    tr, squeeze = _as_2d(true_range(high, low, close))
+    n_rows, n_steps = tr.shape
+    start = np.zeros(n_rows, dtype=np.int64) if start is None else np.asarray(start)
+    seed_pos = start + window - 1
+    out = np.zeros_like(tr)
+
+    rows = np.flatnonzero(seed_pos < n_steps)
+    if len(rows):
+        steps = np.arange(n_steps)
+        tr = tr[rows]
+        start, seed_pos = start[rows, None], seed_pos[rows, None]
+
+        # Seed: mean of the available true ranges in the first window
+        in_seed = (steps >= start) & (steps <= seed_pos)
+        count = (in_seed & ~np.isnan(tr)).sum(axis=1)
+        total = np.where(in_seed & ~np.isnan(tr), tr, 0.0).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            seed = np.where(count > 0, total / count, np.nan)
+
+        # Wilder smoothing is an EMA with alpha = 1 / window started from the seed
+        x = np.where(steps <= seed_pos, seed[:, None], tr)
+        smoothed = _ema_recursive(x, 1.0 / window, seed)
+        smoothed[steps < seed_pos] = 0.0
+        smoothed[np.arange(len(rows)), seed_pos[:, 0]] = seed
+        out[rows] = smoothed
+    return _squeeze(out, squeeze)
+
+def obv(close, volume):
+    """``ta.volume.OnBalanceVolumeIndicator(close, volume).on_balance_volume()``."""
+    close, squeeze = _as_2d(close)
+    volume, _ = _as_2d(volume)
+    signed = np.where(close < _shift(close), -volume, volume)
+    missing = np.isnan(signed)
+    out = np.cumsum(np.where(missing, 0.0, signed), axis=1)
+    out[missing] = np.nan
+    return _squeeze(out, squeeze)
+
+def compute_indicators(close, high, low, volume, start=None):
+    """
+    Compute every feature column of feature_engineering.featurize.
+
+    Args:
+        close, high, low, volume: arrays of shape (time,) or (symbols, time)
+        start: optional per-symbol index where each history begins (panels)
+
+    Returns:
+        dict: column name -> array of the input shape
+    """
+    close, squeeze = _as_2d(close)
+    high, _ = _as_2d(high)
+    low, _ = _as_2d(low)
+    volume, _ = _as_2d(volume)
+
+    features = {"daily_return": pct_change(close), "rsi14": rsi(close, 14, start)}
+    features["sma20"] = rolling_mean(close, 20)
+    features["sma50"] = rolling_mean(close, 50)
+    features["sma200"] = rolling_mean(close, 200)
+    features["ema20"] = ema(close, 20)
+    features["macd"], features["macd_signal"], features["macd_diff"] = macd(close)
+    # Bollinger middle band is the 20-bar SMA; only the deviation is extra work
+    std = rolling_std(close, 20, ddof=0)
+    features["bb_high"] = features["sma20"] + 2 * std
+    features["bb_low"] = features["sma20"] - 2 * std
+    features["bb_mid"] = features["sma20"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        features["bb_width"] = (features["bb_high"] - features["bb_low"]) / features["bb_mid"]
+    features["atr"] = atr(high, low, close, 14, start)
+    features["obv"] = obv(close, volume)
+    return _squeeze(features, squeeze)
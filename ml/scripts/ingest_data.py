@@ -1,8 +1,10 @@
 import yfinance as yf
 import pandas as pd
-import sys, os
+import argparse, os
 
-def download(symbol, start="2015-01-01", end=None):
+import data_store
+
+def download(symbol, start="2015-01-01", end=None, storage="csv"):
     """
     Download historical stock data for a specific symbol.
     
@@ -10,9 +12,10 @@ def download(symbol, start="2015-01-01", end=None):
         symbol (str): The stock ticker symbol (e.g., 'AAPL')
         start (str): Start date in YYYY-MM-DD format
         end (str): End date in YYYY-MM-DD format, defaults to today
+        storage (str): Storage format, "csv" or "npy"
     
     Returns:
-        None: Saves data to CSV file
+        None: Saves data to CSV file (or the npy column layout)
     """
     # Download data
     data = yf.download(symbol, start=start, end=end or pd.Timestamp.today().strftime('%Y-%m-%d'))
@@ -24,11 +27,11 @@ def download(symbol, start="2015-01-01", end=None):
     # Make sure directory exists
     os.makedirs("data/raw", exist_ok=True)
     
-    # Save to CSV
-    df.to_csv(f"data/raw/{symbol}.csv", index=False)
+    # Save to CSV or the npy column layout
+    data_store.write_raw(df, symbol, storage)
     
     # Print summary
-    print(f"Saved raw data for {symbol} --> data/raw/{symbol}.csv")
+    print(f"Saved raw data for {symbol} --> {data_store.raw_path(symbol, storage)}")
     print(f"Downloaded {len(df)} rows of data")
     print(f"Date range: {df['Date'].min().strftime('%Y-%m-%d')} to {df['Date'].max().strftime('%Y-%m-%d')}")
     
@@ -44,12 +47,12 @@ def download(symbol, start="2015-01-01", end=None):
     return df
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python ingest_data.py <SYMBOL> [START_DATE] [END_DATE]")
-        sys.exit(1)
-        
-    symbol = sys.argv[1]
-    start_date = sys.argv[2] if len(sys.argv) > 2 else "2015-01-01"
-    end_date = sys.argv[3] if len(sys.argv) > 3 else None
-    
-    download(symbol, start=start_date, end=end_date)
+    parser = argparse.ArgumentParser(description="Download historical stock data")
+    parser.add_argument("symbol", help="Stock ticker symbol (e.g., AAPL)")
+    parser.add_argument("start_date", nargs="?", default="2015-01-01", help="YYYY-MM-DD")
+    parser.add_argument("end_date", nargs="?", default=None, help="YYYY-MM-DD (default: today)")
+    parser.add_argument("--storage", choices=data_store.FORMATS, default="csv",
+                        help="Storage format for the raw data")
+    args = parser.parse_args()
+    
+    download(args.symbol, start=args.start_date, end=args.end_date, storage=args.storage)
@@ -0,0 +1,145 @@
+# ml/scripts/run_universe.py
+"""
+Run the feature pipeline over a whole universe of symbols in parallel.
+
+Usage:
+    python scripts/run_universe.py symbols.txt [--workers N] [--chunksize N]
+                                               [--incremental] [--download]
+                                               [--storage {csv,npy}]
+
+The symbols file has one ticker per line; blank lines and lines starting
+with '#' are ignored. Each symbol is processed in isolation, so a failure
+for one ticker is reported in the summary without stopping the run.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+def read_symbols(path):
+    """Read a symbol list file, one ticker per line."""
+    symbols = []
+    with open(path) as f:
+        for line in f:
+            symbol = line.split("#", 1)[0].strip().upper()
+            if symbol and symbol not in symbols:
+                symbols.append(symbol)
+    return symbols
+
+def process_symbol(symbol, incremental=False, download=False, verbose=False, storage="csv"):
+    """
+    Download (optionally) and featurize one symbol.
+
+    Returns:
+        tuple: (symbol, rows written or None on failure, error message, seconds)
+    """
+    from feature_engineering import featurize
+
+    start = time.perf_counter()
+    output = sys.stdout if verbose else io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            if download:
+                from ingest_data import download as download_symbol
+                download_symbol(symbol, storage=storage)
+            df = featurize(symbol, incremental=incremental, storage=storage)
+        if df is None:
+            # featurize reports problems on stdout; surface the last message
+            messages = output.getvalue().strip().splitlines() if not verbose else []
+            error = messages[-1] if messages else "featurization failed"
+            return symbol, None, error, time.perf_counter() - start
+        return symbol, len(df), None, time.perf_counter() - start
+    except Exception as e:
+        return symbol, None, f"{type(e).__name__}: {e}", time.perf_counter() - start
+
+def _process_chunk(args):
+    symbols, incremental, download, verbose, storage = args
+    return [
+        process_symbol(symbol, incremental, download, verbose, storage) for symbol in symbols
+    ]
+
+def run_universe(symbols, workers=None, chunksize=None, incremental=False, download=False,
+                 verbose=False, storage="csv"):
+    """
+    Featurize every symbol across a process pool and print a throughput summary.
+
+    Args:
+        symbols (list): Ticker symbols to process
+        workers (int): Worker processes, defaults to one per core
+        chunksize (int): Symbols handed to a worker at a time; defaults to
+            spreading the universe over roughly four chunks per worker
+        incremental (bool): Use incremental featurization
+        download (bool): Refresh raw data with ingest_data.download first
+        storage (str): Storage format for raw and processed data, "csv" or "npy"
+
+    Returns:
+        list: (symbol, rows, error, seconds) per symbol
+    """
+    workers = workers or os.cpu_count() or 1
+    chunksize = chunksize or max(1, len(symbols) // (workers * 4))
+    chunks = [
+        (symbols[i:i + chunksize], incremental, download, verbose, storage)
+        for i in range(0, len(symbols), chunksize)
+    ]
+
+    print(f"Processing {len(symbols)} symbols with {workers} workers "
+          f"({len(chunks)} chunks of up to {chunksize})")
+
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_results in executor.map(_process_chunk, chunks):
+            for symbol, rows, error, seconds in chunk_results:
+                if error:
+                    print(f"  {symbol}: FAILED ({error})")
+                elif verbose:
+                    print(f"  {symbol}: {rows} rows in {seconds:.2f}s")
+            results.extend(chunk_results)
+    elapsed = time.perf_counter() - start
+
+    succeeded = [r for r in results if r[2] is None]
+    failed = [r for r in results if r[2] is not None]
+    total_rows = sum(r[1] for r in succeeded)
+
+    print("\nSummary:")
+    print(f"Symbols: {len(succeeded)} succeeded, {len(failed)} failed")
+    print(f"Rows written: {total_rows}")
+    print(f"Elapsed: {elapsed:.2f}s")
+    if elapsed > 0:
+        print(f"Throughput: {len(results) / elapsed:.1f} symbols/sec, "
+              f"{total_rows / elapsed:.0f} rows/sec")
+    if failed:
+        print(f"Failed symbols: {', '.join(r[0] for r in failed)}")
+
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Featurize a universe of symbols in parallel")
+    parser.add_argument("symbols_file", help="File with one ticker symbol per line")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: cores)")
+    parser.add_argument("--chunksize", type=int, default=None, help="Symbols per scheduled chunk")
+    parser.add_argument("--incremental", action="store_true", help="Only process new bars")
+    parser.add_argument("--download", action="store_true", help="Download raw data first")
+    parser.add_argument("--verbose", action="store_true", help="Show per-symbol output")
+    parser.add_argument("--storage", choices=("csv", "npy"), default="csv",
+                        help="Storage format for raw and processed data")
+    args = parser.parse_args()
+
+    symbols = read_symbols(args.symbols_file)
+    if not symbols:
+        print(f"Error: no symbols found in {args.symbols_file}")
+        sys.exit(1)
+
+    results = run_universe(
+        symbols,
+        workers=args.workers,
+        chunksize=args.chunksize,
+        incremental=args.incremental,
+        download=args.download,
+        verbose=args.verbose,
+        storage=args.storage,
+    )
+    sys.exit(1 if any(error for _, _, error, _ in results) else 0)
@@ -5,19 +5,24 @@ requiring the full model to be trained.
 """
 
 import os
-import pandas as pd
 import sys
 import json
+import shutil
+import tempfile
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+
+import data_store
+
 # Ensure data directories exist
 os.makedirs('data/processed', exist_ok=True)
 os.makedirs('data/sentiment', exist_ok=True)
 os.makedirs('models', exist_ok=True)
 
-def check_data_quality(symbol):
+def check_data_quality(symbol, storage="csv"):
     """Check if we have proper feature data for the symbol"""
-    features_path = f'data/processed/{symbol}_features.csv'
+    features_path = data_store.processed_path(symbol, storage)
     
     if not os.path.exists(features_path):
         print(f"Error: Features file not found at {features_path}")
@@ -25,7 +30,7 @@ def check_data_quality(symbol):
         return False
     
     try:
-        df = pd.read_csv(features_path, index_col='Date', parse_dates=True)
+        df = data_store.read_processed(symbol, storage)
         print(f"Successfully loaded feature data for {symbol}")
         print(f"Data shape: {df.shape}")
         print(f"Date range: {df.index.min().date()} to {df.index.max().date()}")
@@ -44,9 +49,9 @@ def check_data_quality(symbol):
         print(f"Error reading feature data: {e}")
         return False
 
-def simulate_prediction(symbol):
+def simulate_prediction(symbol, storage="csv"):
     """Simulate a prediction without a real model"""
-    features_path = f'data/processed/{symbol}_features.csv'
+    features_path = data_store.processed_path(symbol, storage)
     
     if not os.path.exists(features_path):
         return {
@@ -57,7 +62,7 @@ def simulate_prediction(symbol):
     
     try:
         # Load the features
-        df = pd.read_csv(features_path, index_col='Date', parse_dates=True)
+        df = data_store.read_processed(symbol, storage)
         
         # Get the most recent data point
         latest = df.iloc[-1]
@@ -89,17 +94,165 @@ def simulate_prediction(symbol):
             "confidence": None
         }
 
+def check_incremental_features(symbol, holdout=30):
+    """
+    Check that incremental featurization is bit-identical to a full recompute.
+
+    Featurizes all but the last `holdout` raw bars, appends the rest in
+    several increments, and compares the processed file byte for byte with
+    a full recompute over the complete raw file.
+    """
+    from feature_engineering import featurize
+
+    raw_path = os.path.abspath(f'data/raw/{symbol}.csv')
+    if not os.path.exists(raw_path):
+        print(f"Error: Raw data file not found at {raw_path}")
+        return False
+
+    with open(raw_path) as f:
+        lines = f.readlines()
+    cut = len(lines) - holdout
+    increments = [lines[cut:cut + 1], lines[cut + 1:cut + 10], lines[cut + 10:]]
+
+    cwd = os.getcwd()
+    full_dir, inc_dir = tempfile.mkdtemp(), tempfile.mkdtemp()
+    try:
+        # Full recompute over the complete raw history
+        os.chdir(full_dir)
+        os.makedirs('data/raw')
+        shutil.copy(raw_path, 'data/raw/')
+        featurize(symbol, engine="ta")
+        with open(f'data/processed/{symbol}_features.csv', 'rb') as f:
+            expected = f.read()
+
+        # Bootstrap on the truncated history, then append bars in increments
+        os.chdir(inc_dir)
+        os.makedirs('data/raw')
+        with open(f'data/raw/{symbol}.csv', 'w') as f:
+            f.writelines(lines[:cut])
+        featurize(symbol, incremental=True)
+        for chunk in increments:
+            with open(f'data/raw/{symbol}.csv', 'a') as f:
+                f.writelines(chunk)
+            featurize(symbol, incremental=True)
+        with open(f'data/processed/{symbol}_features.csv', 'rb') as f:
+            actual = f.read()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(full_dir)
+        shutil.rmtree(inc_dir)
+
+    if actual == expected:
+        print(f"Incremental features for {symbol} match a full recompute exactly")
+        return True
+    print(f"Error: incremental features for {symbol} differ from a full recompute")
+    return False
+
+def check_full_run_between_incremental(symbol, holdout=30):
+    """
+    Check that a full featurization between incremental runs leaves the
+    incremental output intact.
+
+    Bootstraps incremental state on all but the last `holdout` raw bars,
+    appends some, runs a default full featurization, appends the rest
+    incrementally, and compares the processed file byte for byte with a
+    full recompute over the complete raw file.
+    """
+    from feature_engineering import featurize
+
+    raw_path = os.path.abspath(f'data/raw/{symbol}.csv')
+    if not os.path.exists(raw_path):
+        print(f"Error: Raw data file not found at {raw_path}")
+        return False
+
+    with open(raw_path) as f:
+        lines = f.readlines()
+    cut = len(lines) - holdout
+
+    cwd = os.getcwd()
+    full_dir, inc_dir = tempfile.mkdtemp(), tempfile.mkdtemp()
+    try:
+        os.chdir(full_dir)
+        os.makedirs('data/raw')
+        shutil.copy(raw_path, 'data/raw/')
+        featurize(symbol)
+        with open(f'data/processed/{symbol}_features.csv', 'rb') as f:
+            expected = f.read()
+
+        os.chdir(inc_dir)
+        os.makedirs('data/raw')
+        with open(f'data/raw/{symbol}.csv', 'w') as f:
+            f.writelines(lines[:cut])
+        featurize(symbol, incremental=True)
+        with open(f'data/raw/{symbol}.csv', 'a') as f:
+            f.writelines(lines[cut:cut + 10])
+        featurize(symbol, incremental=True)
+        # A full run (default engine) in between, then more incremental bars
+        featurize(symbol)
+        with open(f'data/raw/{symbol}.csv', 'a') as f:
+            f.writelines(lines[cut + 10:])
+        featurize(symbol, incremental=True)
+        with open(f'data/processed/{symbol}_features.csv', 'rb') as f:
+            actual = f.read()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(full_dir)
+        shutil.rmtree(inc_dir)
+
+    if actual == expected:
+        print(f"Incremental features for {symbol} survive a full run in between")
+        return True
+    print(f"Error: incremental features for {symbol} are corrupted by a full run in between")
+    return False
+
+def check_indicator_kernel(symbol, rtol=1e-8, atol=1e-10):
+    """
+    Check that the vectorized NumPy indicators match the ta implementation.
+
+    Compares every feature column computed over the raw history by both
+    engines, including where each column is NaN.
+    """
+    import numpy as np
+    from feature_engineering import FEATURE_COLUMNS, compute_features, load_raw
+
+    raw = load_raw(symbol)
+    if raw is None:
+        return False
+
+    expected = compute_features(raw, engine="ta")
+    actual = compute_features(raw, engine="numpy")
+
+    ok = True
+    for col in FEATURE_COLUMNS + ['target']:
+        a, b = actual[col].to_numpy(np.float64), expected[col].to_numpy(np.float64)
+        if not np.allclose(a, b, rtol=rtol, atol=atol, equal_nan=True):
+            worst = np.nanmax(np.abs(a - b) / np.maximum(np.abs(b), atol))
+            print(f"Error: {col} differs from ta (max relative error {worst:.2e})")
+            ok = False
+
+    if ok:
+        print(f"NumPy indicators for {symbol} match ta on {len(raw)} bars")
+    return ok
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python test_pipeline.py <SYMBOL>")
+        print("Usage: python test_pipeline.py <SYMBOL> [--check-incremental] [--check-indicators] [--storage csv|npy]")
         sys.exit(1)
         
     symbol = sys.argv[1]
+    storage = sys.argv[sys.argv.index("--storage") + 1] if "--storage" in sys.argv else "csv"
+    
+    if "--check-incremental" in sys.argv:
+        ok = check_incremental_features(symbol)
+        ok = check_full_run_between_incremental(symbol) and ok
+        sys.exit(0 if ok else 1)
+    if "--check-indicators" in sys.argv:
+        sys.exit(0 if check_indicator_kernel(symbol) else 1)
     
     # Check data quality
-    if check_data_quality(symbol):
+    if check_data_quality(symbol, storage):
         print("\nGenerating simulated prediction...")
-        result = simulate_prediction(symbol)
+        result = simulate_prediction(symbol, storage)
         print(json.dumps(result, indent=2))
     else:
         print("Data quality check failed. Please fix issues before proceeding.") 
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""
+Benchmark Firebase ID token verification with and without the token cache.
+
+Signs test tokens with a throwaway RSA key and serves its certificate as the
+preloaded signing certificates, so nothing goes to the network. Times:
+
+  * full verification (signature check) for every request
+  * get_current_user with the same token repeated (verified-token cache)
+
+Run from the repository root with the app's environment configured (.env).
+
+Usage:
+    python scripts/benchmark_auth.py [--requests 20000] [--tokens 100]
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import sys
+import time
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from jose import jwt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import firebase_admin  # noqa: E402
+from firebase_admin import auth as fb_auth, credentials  # noqa: E402
+import app.firebase_auth as firebase_auth  # noqa: E402
+
+PROJECT_ID = "benchmark-project"
+KEY_ID = "benchmark-key"
+
+class NoCredential(credentials.Base):
+    def get_credential(self):
+        return None
+
+class CertResponse:
+    """Minimal google-auth response carrying the test certificate."""
+
+    status = 200
+    headers = {}
+
+    def __init__(self, pem):
+        self.data = json.dumps({KEY_ID: pem}).encode("utf-8")
+
+def self_signed(key):
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "benchmark")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(1)
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    return cert.public_bytes(serialization.Encoding.PEM).decode()
+
+def make_token(pem_key, uid):
+    now = int(time.time())
+    claims = {
+        "iss": f"https://securetoken.google.com/{PROJECT_ID}",
+        "aud": PROJECT_ID,
+        "sub": uid,
+        "iat": now - 10,
+        "auth_time": now - 10,
+        "exp": now + 3600,
+    }
+    return jwt.encode(claims, pem_key, algorithm="RS256", headers={"kid": KEY_ID})
+
+async def timed(fn, tokens, requests):
+    """Mean microseconds per call, cycling through tokens."""
+    start = time.perf_counter()
+    for i in range(requests):
+        await fn(tokens[i % len(tokens)])
+    return (time.perf_counter() - start) / requests * 1e6
+
+async def main(args):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem_key = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    response = CertResponse(self_signed(key))
+
+    # Replace whatever app the module initialized with one for the test project
+    for app in list(firebase_admin._apps.values()):
+        firebase_admin.delete_app(app)
+    firebase_admin.initialize_app(NoCredential(), {"projectId": PROJECT_ID})
+    verifier = fb_auth._get_client(firebase_admin.get_app())._token_verifier
+    verifier.request = lambda url, **kwargs: response
+    if not firebase_auth.refresh_certs():
+        sys.exit("Could not install preloaded certificates")
+
+    tokens = [make_token(pem_key, f"user-{i}") for i in range(args.tokens)]
+    uncached = await timed(
+        lambda token: asyncio.to_thread(fb_auth.verify_id_token, token), tokens, args.requests
+    )
+    cached = await timed(
+        lambda token: firebase_auth.get_current_user(f"Bearer {token}"), tokens, args.requests
+    )
+
+    stats = firebase_auth.token_cache.stats()
+    print(f"{args.requests:,} requests over {args.tokens} tokens")
+    print(f"Verify every request:  {uncached:9.1f} us/request")
+    print(f"Verified-token cache:  {cached:9.1f} us/request  ({uncached / cached:,.0f}x)")
+    print(f"Cache hit rate: {stats['hit_ratio']:.1%}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ID token verification")
+    parser.add_argument("--requests", type=int, default=20_000, help="Requests per mode")
+    parser.add_argument("--tokens", type=int, default=100, help="Distinct users/tokens")
+    asyncio.run(main(parser.parse_args()))
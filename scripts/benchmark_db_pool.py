@@ -0,0 +1,94 @@
+"""
+Benchmark connection pool saturation with the async engine.
+
+Runs increasing numbers of concurrent "requests", each checking out a
+connection, running a query and holding the connection for --hold-ms (a
+stand-in for query and transaction time). Reports how long requests wait
+for a connection, throughput and pool timeouts at each level. Waits stay
+near zero until concurrency passes pool size + overflow; beyond that,
+throughput is capped at (pool size + overflow) / hold time and requests
+queue for connections until they hit the pool timeout.
+
+Run from the repository root with the app's environment configured (.env).
+Pool settings default to DB_POOL_SIZE / DB_MAX_OVERFLOW from Settings.
+
+Usage:
+    python scripts/benchmark_db_pool.py [--url sqlite:///pool_bench.db] [--concurrency 1 5 15 30 60]
+                                        [--hold-ms 20] [--requests 10] [--pool-timeout 2]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from app.db import async_driver_url  # noqa: E402
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return float("nan")
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+async def client(engine, requests, hold, waits, counts):
+    """Issue `requests` requests back to back, recording connection wait times."""
+    for _ in range(requests):
+        start = time.perf_counter()
+        try:
+            async with engine.connect() as conn:
+                waits.append(time.perf_counter() - start)
+                await conn.execute(text("SELECT 1"))
+                await asyncio.sleep(hold)
+            counts["ok"] += 1
+        except PoolTimeout:
+            counts["timeouts"] += 1
+
+async def run_level(engine, concurrency, requests, hold):
+    waits, counts = [], {"ok": 0, "timeouts": 0}
+    start = time.perf_counter()
+    await asyncio.gather(*(client(engine, requests, hold, waits, counts) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return waits, counts, counts["ok"] / elapsed
+
+async def main(args):
+    engine = create_async_engine(
+        async_driver_url(args.url),
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=args.pool_size,
+        max_overflow=args.max_overflow,
+        pool_timeout=args.pool_timeout,
+    )
+    # Open the first connection outside the measurements
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+    capacity = args.pool_size + args.max_overflow
+    print(f"Pool size {args.pool_size} + overflow {args.max_overflow} = {capacity} connections, "
+          f"hold {args.hold_ms:.0f} ms, timeout {args.pool_timeout:.1f}s")
+    print(f"Throughput ceiling: {capacity / (args.hold_ms / 1000):.0f} req/s\n")
+    print(f"{'clients':>8}{'req/s':>10}{'wait p50':>11}{'wait p99':>11}{'timeouts':>10}")
+    for concurrency in args.concurrency:
+        waits, counts, rate = await run_level(engine, concurrency, args.requests, args.hold_ms / 1000)
+        print(f"{concurrency:>8}{rate:>10.0f}{percentile(waits, 50) * 1000:>9.1f}ms"
+              f"{percentile(waits, 99) * 1000:>9.1f}ms{counts['timeouts']:>10}")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Connection pool saturation benchmark")
+    parser.add_argument("--url", default="sqlite:///pool_bench.db", help="Database URL (sync form)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 5, 15, 30, 60],
+                        help="Concurrent clients per level")
+    parser.add_argument("--requests", type=int, default=10, help="Requests per client")
+    parser.add_argument("--hold-ms", type=float, default=20.0, help="Time each request holds its connection")
+    parser.add_argument("--pool-size", type=int, default=settings.DB_POOL_SIZE)
+    parser.add_argument("--max-overflow", type=int, default=settings.DB_MAX_OVERFLOW)
+    parser.add_argument("--pool-timeout", type=float, default=2.0, help="Seconds to wait for a connection")
+    asyncio.run(main(parser.parse_args()))
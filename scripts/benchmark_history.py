@@ -0,0 +1,136 @@
+"""
+Benchmark /history queries on a seeded SQLite predictions table.
+
+Seeds --rows predictions (one power user with --power-rows of them, the
+rest spread over --users users, all keyed by string Firebase-style uids),
+then times:
+
+  * the old query: every row of the power user as ORM objects, no
+    composite index
+  * keyset pages from get_prediction_history with the
+    (user_id, date DESC, id DESC) index, first page and a deep page
+
+Run from the repository root with the app's environment configured (.env),
+since app.db reads the settings on import. The seeded database is reused on
+later runs unless --reseed is given.
+
+Usage:
+    python scripts/benchmark_history.py [--db history_bench.db] [--rows 10000000]
+                                        [--users 20000] [--power-rows 100000] [--limit 50]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import Base, Prediction, get_prediction_history  # noqa: E402
+
+POWER_USER = "power0user0firebase0uid000001"
+INDEX_NAME = "ix_predictions_user_id_date"
+
+def seed(path, rows, users, power_rows, chunk=200_000):
+    """Fill the predictions table with random rows, spread over five years."""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    # Build the index after loading; much faster than maintaining it per row
+    conn.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
+    rng = random.Random(0)
+    start = datetime(2020, 1, 1)
+    span = 5 * 365 * 86400
+    directions = ("Up", "Down", "Neutral")
+    for offset in range(0, rows, chunk):
+        batch = []
+        for i in range(offset, min(offset + chunk, rows)):
+            user_id = POWER_USER if i < power_rows else f"user{rng.randrange(users):024d}"
+            date = start + timedelta(seconds=rng.randrange(span))
+            # Same text format SQLAlchemy uses for DateTime on SQLite
+            batch.append((user_id, rng.choice("ABCDEFGH") * 3, date.strftime("%Y-%m-%d %H:%M:%S.%f"),
+                          rng.choice(directions), rng.random(), rng.choice(directions + (None,))))
+        conn.executemany(
+            "INSERT INTO predictions (user_id, symbol, date, direction, confidence, actual) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            batch,
+        )
+        conn.commit()
+        print(f"  seeded {min(offset + chunk, rows):,} rows", end="\r")
+    print()
+    conn.close()
+
+def timed(fn, repeat):
+    """Best of `repeat` runs: (seconds, result)."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def old_history(db):
+    return db.query(Prediction).filter(Prediction.user_id == POWER_USER).order_by(Prediction.date.desc()).all()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark prediction history queries")
+    parser.add_argument("--db", default="history_bench.db", help="SQLite file to seed")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="Total predictions")
+    parser.add_argument("--users", type=int, default=20_000, help="Other users")
+    parser.add_argument("--power-rows", type=int, default=100_000, help="Predictions of the power user")
+    parser.add_argument("--limit", type=int, default=50, help="Page size")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions")
+    parser.add_argument("--reseed", action="store_true", help="Rebuild the database")
+    args = parser.parse_args()
+
+    if args.reseed and os.path.exists(args.db):
+        os.remove(args.db)
+    if not os.path.exists(args.db):
+        print(f"Seeding {args.rows:,} rows into {args.db}...")
+        start = time.perf_counter()
+        seed(args.db, args.rows, args.users, args.power_rows)
+        print(f"Seeded in {time.perf_counter() - start:.1f}s")
+
+    engine = create_engine(f"sqlite:///{args.db}")
+    Session = sessionmaker(bind=engine)
+    index = next(ix for ix in Prediction.__table__.indexes if ix.name == INDEX_NAME)
+
+    with Session() as db:
+        index.drop(bind=engine, checkfirst=True)
+        before, old_rows = timed(lambda: old_history(db), args.repeat)
+        db.expunge_all()
+
+        start = time.perf_counter()
+        index.create(bind=engine)
+        print(f"Created {INDEX_NAME} in {time.perf_counter() - start:.1f}s")
+
+        with_index, _ = timed(lambda: old_history(db), args.repeat)
+        db.expunge_all()
+        first, (page, cursor) = timed(
+            lambda: get_prediction_history(db, POWER_USER, limit=args.limit), args.repeat
+        )
+
+        # Walk ~90% of the history to get a deep cursor, then time the page after it
+        deep_cursor = cursor
+        for _ in range(int(len(old_rows) * 0.9) // args.limit):
+            _, deep_cursor = get_prediction_history(db, POWER_USER, before=deep_cursor, limit=args.limit)
+        deep, (deep_page, _) = timed(
+            lambda: get_prediction_history(db, POWER_USER, before=deep_cursor, limit=args.limit),
+            args.repeat,
+        )
+
+    print(f"Power user: {len(old_rows):,} of {args.rows:,} predictions, page size {args.limit}")
+    print(f"All rows as ORM objects, no index:   {before * 1000:9.2f} ms")
+    print(f"All rows as ORM objects, with index: {with_index * 1000:9.2f} ms")
+    print(f"Keyset first page (columns only):    {first * 1000:9.2f} ms  ({before / first:,.0f}x)")
+    print(f"Keyset page at ~90% depth:           {deep * 1000:9.2f} ms  ({before / deep:,.0f}x)")
+    print(f"First page matches old order: {[r.id for r in page] == [r.id for r in old_rows[:args.limit]]}")
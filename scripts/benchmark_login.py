@@ -0,0 +1,69 @@
+"""
+Benchmark how a burst of password logins affects other requests.
+
+Runs --logins concurrent bcrypt verifications while a probe coroutine
+stands in for unrelated requests: it sleeps 5 ms in a loop and records how
+late the event loop wakes it. Compares verifying inline on the event loop
+(as authenticate_user used to) with verify_password_async on the password
+pool.
+
+Run from the repository root with the app's environment configured (.env);
+set PASSWORD_HASH_WORKERS to change the pool size.
+
+Usage:
+    python scripts/benchmark_login.py [--logins 20]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.auth as auth  # noqa: E402
+
+PROBE_INTERVAL = 0.005
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return float("nan")
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+async def probe(lags, done):
+    """Record how late each short sleep returns until the logins finish."""
+    loop = asyncio.get_running_loop()
+    while not done.is_set():
+        start = loop.time()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(loop.time() - start - PROBE_INTERVAL)
+
+async def inline_login(password, hashed):
+    return auth.verify_password(password, hashed)
+
+async def run(login, logins, hashed):
+    lags, done = [], asyncio.Event()
+    prober = asyncio.create_task(probe(lags, done))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(login("benchmark-password", hashed) for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await prober
+    assert all(results)
+    return elapsed, lags
+
+async def main(args):
+    hashed = auth.get_password_hash("benchmark-password")
+    print(f"{args.logins} concurrent logins, password pool of {auth.password_workers} threads")
+    print(f"{'mode':<8}{'logins':>10}{'probe lag p50':>16}{'probe lag max':>16}")
+    for name, login in (("inline", inline_login), ("pool", auth.verify_password_async)):
+        elapsed, lags = await run(login, args.logins, hashed)
+        print(f"{name:<8}{elapsed:>9.2f}s{percentile(lags, 50) * 1000:>14.1f}ms{max(lags) * 1000:>14.1f}ms")
+    auth.password_executor.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Event loop lag during a login burst")
+    parser.add_argument("--logins", type=int, default=20, help="Concurrent password verifications")
+    asyncio.run(main(parser.parse_args()))
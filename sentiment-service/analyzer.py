@@ -1,17 +1,204 @@
 import os
+import time
+import threading
+import numpy as np
 from dotenv import load_dotenv
-from transformers import pipeline
+
+import model_host
+from cache import lookup_headlines, store_headlines
 
 # Load environment variables
 load_dotenv()
 
-# Load the sentiment analysis model
-# This is done once at module import time to avoid reloading
-nlp = pipeline(
-    "sentiment-analysis",
-    model="yjernite/finbert-tone",
-    device=0 if os.getenv("USE_GPU", "0") == "1" else -1
-)
+MODEL_NAME = os.getenv("SENTIMENT_MODEL", "yjernite/finbert-tone")
+
+# Inference backend: "torch" (full precision PyTorch) or "onnx" (ONNX Runtime
+# graph exported and INT8-quantized by export_onnx.py, loaded from a local path)
+BACKEND = os.getenv("SENTIMENT_BACKEND", "torch")
+ONNX_MODEL_PATH = os.getenv("SENTIMENT_ONNX_MODEL", "models/finbert-onnx/model.int8.onnx")
+
+# Inference settings
+# BATCH_SIZE: headlines per forward pass
+# MAX_LENGTH: headlines are truncated to this many tokens
+# NUM_THREADS: intra-op threads for CPU inference (0 keeps the runtime default)
+BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", 32))
+MAX_LENGTH = int(os.getenv("SENTIMENT_MAX_LENGTH", 64))
+NUM_THREADS = int(os.getenv("SENTIMENT_NUM_THREADS", 0))
+# STREAM_BATCH_SIZE: headlines per batch when results are streamed; smaller
+#   batches reach the client sooner at some cost in throughput
+STREAM_BATCH_SIZE = int(os.getenv("SENTIMENT_STREAM_BATCH_SIZE", 8))
+
+# Headlines scored by warm_up() to fault in weights and kernels before the
+# first real request
+WARMUP_TEXTS = [
+    "Shares rise after earnings beat expectations",
+    "Stock falls as guidance disappoints investors and analysts cut price targets",
+]
+
+class TorchBackend:
+    """The Hugging Face model in PyTorch."""
+    
+    name = "torch"
+    
+    def __init__(self, model_name=MODEL_NAME):
+        import torch
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+        
+        if NUM_THREADS > 0:
+            torch.set_num_threads(NUM_THREADS)
+        self.torch = torch
+        self.device = torch.device("cuda:0" if os.getenv("USE_GPU", "0") == "1" else "cpu")
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_name).to(self.device).eval()
+        self.id2label = self.model.config.id2label
+    
+    def predict(self, features):
+        """Class probabilities for a batch of numpy-encoded inputs."""
+        inputs = {key: self.torch.from_numpy(value).to(self.device) for key, value in features.items()}
+        with self.torch.inference_mode():
+            return self.model(**inputs).logits.softmax(dim=-1).cpu().numpy()
+
+class OnnxBackend:
+    """An exported ONNX graph (see export_onnx.py) run with ONNX Runtime on CPU."""
+    
+    name = "onnx"
+    
+    def __init__(self, model_path=ONNX_MODEL_PATH):
+        import onnxruntime as ort
+        from transformers import AutoConfig, AutoTokenizer
+        
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                f"ONNX model not found at {model_path}. Run export_onnx.py first."
+            )
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if NUM_THREADS > 0:
+            options.intra_op_num_threads = NUM_THREADS
+        self.session = ort.InferenceSession(
+            model_path, options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [node.name for node in self.session.get_inputs()]
+        
+        # Tokenizer and label names are saved next to the graph
+        model_dir = os.path.dirname(model_path)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.id2label = AutoConfig.from_pretrained(model_dir).id2label
+    
+    def predict(self, features):
+        """Class probabilities for a batch of numpy-encoded inputs."""
+        inputs = {name: features[name].astype(np.int64) for name in self.input_names}
+        logits = self.session.run(None, inputs)[0]
+        exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+        return exp / exp.sum(axis=-1, keepdims=True)
+
+BACKENDS = {"torch": TorchBackend, "onnx": OnnxBackend}
+
+def load_backend(name=BACKEND):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown SENTIMENT_BACKEND {name!r}, expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name]()
+
+# The model is loaded on first use (or by warm_up at startup), not at import,
+# so the service starts serving cached results immediately
+model_backend = None
+model_lock = threading.Lock()
+model_state = {"loaded": False, "warm": False, "load_seconds": None,
+               "warmup_seconds": None, "error": None}
+
+def get_backend():
+    """Load the selected backend once; concurrent callers wait for the same load."""
+    global model_backend
+    if model_backend is not None:
+        return model_backend
+    with model_lock:
+        if model_backend is None:
+            start = time.perf_counter()
+            try:
+                model_backend = load_backend()
+            except Exception as e:
+                model_state["error"] = str(e)
+                raise
+            model_state.update(loaded=True, error=None,
+                               load_seconds=time.perf_counter() - start)
+            print(f"Loaded {BACKEND} sentiment model in {model_state['load_seconds']:.2f}s")
+    return model_backend
+
+def warm_up():
+    """
+    Load the model and score a dummy batch.
+    
+    The first forward pass pays for lazy allocations and kernel selection;
+    running it here keeps that off the first user request.
+    """
+    if model_state["warm"]:
+        return model_state
+    backend = get_backend()
+    start = time.perf_counter()
+    score_texts(WARMUP_TEXTS, backend=backend)
+    model_state.update(warm=True, warmup_seconds=time.perf_counter() - start)
+    print(f"Sentiment model warm after {model_state['warmup_seconds']:.2f}s")
+    return model_state
+
+def get_model_status():
+    """Backend name and load/warm-up state, for the readiness endpoint."""
+    return dict(model_state, backend=BACKEND)
+
+def score_texts(texts, batch_size=None, max_length=None, backend=None):
+    """
+    Run the model over a list of texts.
+    
+    Texts are sorted by token length and fed in batches padded only to the
+    longest text of each batch, so short headlines don't pay for long ones.
+    
+    Args:
+        texts: List of strings
+        batch_size: Texts per forward pass (default SENTIMENT_BATCH_SIZE)
+        max_length: Token limit per text (default SENTIMENT_MAX_LENGTH)
+        backend: Backend to run (default: the one selected by SENTIMENT_BACKEND)
+        
+    Returns:
+        List of {"label", "score"} dictionaries in input order, as the
+        transformers sentiment-analysis pipeline returns them
+    """
+    batch_size = batch_size or BATCH_SIZE
+    max_length = max_length or MAX_LENGTH
+    backend = backend or get_backend()
+    if not texts:
+        return []
+    
+    # Token counts only, to bucket texts of similar length together
+    tokenizer = backend.tokenizer
+    encoded = tokenizer(list(texts), truncation=True, max_length=max_length)
+    lengths = [len(ids) for ids in encoded["input_ids"]]
+    order = sorted(range(len(texts)), key=lengths.__getitem__)
+    
+    results = [None] * len(texts)
+    for start in range(0, len(order), batch_size):
+        batch = order[start:start + batch_size]
+        features = tokenizer(
+            [texts[i] for i in batch],
+            padding=True,
+            truncation=True,
+            max_length=max_length,
+            return_tensors="np",
+        )
+        probs = backend.predict(dict(features))
+        labels = probs.argmax(axis=-1)
+        for row, i in enumerate(batch):
+            label = int(labels[row])
+            results[i] = {"label": backend.id2label[label], "score": float(probs[row, label])}
+    
+    # A real batch warms the model as well as the dummy one does, e.g. when
+    # the startup warm-up failed and the model was loaded on first use
+    model_state["warm"] = True
+    return results
+
+def score(texts):
+    """Score texts in this process, or on the model host when SENTIMENT_MODEL_HOST is set."""
+    if model_host.MODEL_HOST:
+        return model_host.score(texts)
+    return score_texts(texts)
 
 def analyze_headlines(articles):
     """
@@ -29,31 +216,80 @@ def analyze_headlines(articles):
     # Extract headline texts
     texts = [art["title"] for art in articles]
     
+    # Only run the model on titles that were never scored (once per duplicate)
+    keys, scored = lookup_headlines(texts)
+    new = {key: text for key, text in zip(keys, texts) if key not in scored}
+    
     # Perform sentiment analysis
-    print(f"Analyzing sentiment for {len(texts)} headlines...")
-    results = nlp(texts)
+    print(f"Analyzing sentiment for {len(new)} new of {len(texts)} headlines...")
+    if new:
+        new_results = score(list(new.values()))
+        store_headlines(list(new), new_results)
+        scored.update(zip(new, new_results))
+    results = [scored[key] for key in keys]
     
     # Combine article data with sentiment results
-    output = []
-    for art, res in zip(articles, results):
-        # Convert score to positive or negative value based on label
-        # POSITIVE → keep score as positive
-        # NEGATIVE → make score negative
-        score = res["score"] if res["label"] == "POSITIVE" else -res["score"]
-        
-        output.append({
-            "title": art["title"],
-            "url": art["url"],
-            "publishedAt": art["publishedAt"],
-            "score": float(score),
-            "label": res["label"]
-        })
+    output = [_format(art, res) for art, res in zip(articles, results)]
     
     # Sort by absolute score (strongest sentiment first)
     output.sort(key=lambda x: abs(x["score"]), reverse=True)
     
     return output
 
+def iter_analyze_headlines(articles, batch_size=None):
+    """
+    Analyze headlines batch by batch, for streaming responses.
+    
+    Yields lists of output items (as in analyze_headlines) as soon as they
+    are known: headlines scored before come first, then one list per
+    inference batch. Items are not sorted.
+    
+    Args:
+        articles: List of article dictionaries from the News API
+        batch_size: Headlines per inference batch (default SENTIMENT_STREAM_BATCH_SIZE)
+    """
+    batch_size = batch_size or STREAM_BATCH_SIZE
+    if not articles:
+        return
+    
+    texts = [art["title"] for art in articles]
+    keys, scored = lookup_headlines(texts)
+    
+    # Articles waiting on each unscored title (duplicates are scored once)
+    pending = {}
+    ready = []
+    for art, key in zip(articles, keys):
+        if key in scored:
+            ready.append(_format(art, scored[key]))
+        else:
+            pending.setdefault(key, []).append(art)
+    if ready:
+        yield ready
+    
+    # Shortest titles first so each batch pads little
+    print(f"Streaming sentiment for {len(pending)} new of {len(texts)} headlines...")
+    order = sorted(pending, key=lambda key: len(pending[key][0]["title"]))
+    for start in range(0, len(order), batch_size):
+        batch = order[start:start + batch_size]
+        results = score([pending[key][0]["title"] for key in batch])
+        store_headlines(batch, results)
+        yield [_format(art, res) for key, res in zip(batch, results) for art in pending[key]]
+
+def _format(art, res):
+    """Combine an article with its model output into a response item."""
+    # Convert score to positive or negative value based on label
+    # POSITIVE → keep score as positive
+    # NEGATIVE → make score negative
+    score = res["score"] if res["label"] == "POSITIVE" else -res["score"]
+    
+    return {
+        "title": art["title"],
+        "url": art["url"],
+        "publishedAt": art["publishedAt"],
+        "score": float(score),
+        "label": res["label"]
+    }
+
 if __name__ == "__main__":
     # Simple test to verify functionality
     from scraper import fetch_headlines
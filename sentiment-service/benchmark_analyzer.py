@@ -0,0 +1,89 @@
+"""
+Benchmark FinBERT headline scoring throughput.
+
+Compares the default transformers pipeline call (what analyze_headlines
+used to do) with the batched, length-bucketed score_texts, on the PyTorch
+backend and, with --onnx, on the quantized ONNX Runtime backend.
+
+Usage:
+    python benchmark_analyzer.py [--headlines N] [--batch-size N] [--max-length N] [--repeat N]
+                                 [--onnx [SENTIMENT_ONNX_MODEL path]]
+"""
+import argparse
+import random
+import time
+
+from transformers import pipeline
+
+import analyzer
+
+SUBJECTS = ["Apple", "Microsoft", "Nvidia", "Tesla", "Amazon", "Alphabet", "Meta"]
+EVENTS = [
+    "shares rise after earnings beat",
+    "stock falls as guidance disappoints investors",
+    "rallies on strong iPhone demand in China and upbeat services revenue outlook",
+    "faces antitrust probe",
+    "announces buyback",
+    "slides after analysts cut price targets citing slowing cloud growth, margin "
+    "pressure and rising capital expenditure on data centers",
+    "hits record high",
+]
+
+def make_headlines(n, seed=0):
+    """Synthetic headlines with a realistic spread of lengths."""
+    rng = random.Random(seed)
+    return [f"{rng.choice(SUBJECTS)} {rng.choice(EVENTS)}" for _ in range(n)]
+
+def best_rate(fn, texts, repeat):
+    fn(texts[:8])  # warm-up
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(texts)
+        best = min(best, time.perf_counter() - start)
+    return len(texts) / best
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark sentiment inference")
+    parser.add_argument("--headlines", type=int, default=200, help="Number of headlines")
+    parser.add_argument("--batch-size", type=int, default=analyzer.BATCH_SIZE)
+    parser.add_argument("--max-length", type=int, default=analyzer.MAX_LENGTH)
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions")
+    parser.add_argument("--onnx", nargs="?", const=analyzer.ONNX_MODEL_PATH, default=None,
+                        help="Also benchmark the ONNX backend (path to the exported graph)")
+    args = parser.parse_args()
+
+    texts = make_headlines(args.headlines)
+    torch_backend = analyzer.get_backend() if analyzer.BACKEND == "torch" else analyzer.TorchBackend()
+    nlp = pipeline(
+        "sentiment-analysis",
+        model=torch_backend.model,
+        tokenizer=torch_backend.tokenizer,
+        device=torch_backend.device,
+    )
+
+    def batched(backend):
+        return lambda t: analyzer.score_texts(t, args.batch_size, args.max_length, backend)
+
+    def agreement(backend):
+        # Same labels as the pipeline, up to float noise from padding and quantization
+        expected = [r["label"] for r in nlp(texts)]
+        actual = [r["label"] for r in batched(backend)(texts)]
+        return sum(a == b for a, b in zip(expected, actual)) / len(texts)
+
+    before = best_rate(nlp, texts, args.repeat)
+    after = best_rate(batched(torch_backend), texts, args.repeat)
+
+    print(f"Device: {torch_backend.device}, threads: {torch_backend.torch.get_num_threads()}")
+    print(f"Headlines: {len(texts)}, batch size: {args.batch_size}, max length: {args.max_length}")
+    print(f"Pipeline (default):     {before:8.1f} headlines/sec")
+    print(f"Batched + bucketed:     {after:8.1f} headlines/sec  ({after / before:.1f}x)")
+    print(f"Label agreement:        {agreement(torch_backend):.1%}")
+
+    if args.onnx:
+        onnx_backend = analyzer.OnnxBackend(args.onnx)
+        onnx_rate = best_rate(batched(onnx_backend), texts, args.repeat)
+        print(f"ONNX Runtime ({args.onnx}):")
+        print(f"Batched + bucketed:     {onnx_rate:8.1f} headlines/sec  "
+              f"({onnx_rate / before:.1f}x pipeline, {onnx_rate / after:.1f}x torch)")
+        print(f"Label agreement:        {agreement(onnx_backend):.1%}")
@@ -0,0 +1,64 @@
+"""
+Benchmark sentiment service startup.
+
+Starts the service with uvicorn and measures how long until it answers
+`/` (serving cached results) and until `/ready` reports the model warm,
+alongside the model load and warm-up times the service reports. With lazy
+loading the first number stays well under a second regardless of model size.
+
+Usage:
+    python benchmark_startup.py [--runs 3] [--port 8011] [--timeout 300]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+def wait_for(client, path, deadline, status=200):
+    """Poll `path` until it returns `status`; returns the response."""
+    while time.perf_counter() < deadline:
+        try:
+            response = client.get(path)
+            if response.status_code == status:
+                return response
+        except httpx.TransportError:
+            pass
+        time.sleep(0.05)
+    raise TimeoutError(f"{path} not {status} before timeout")
+
+def measure(port, timeout):
+    """Start one service process; returns (seconds to serve, seconds to ready, model status)."""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        deadline = start + timeout
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=5) as client:
+            wait_for(client, "/", deadline)
+            serving = time.perf_counter() - start
+            status = wait_for(client, "/ready", deadline).json()
+            ready = time.perf_counter() - start
+    finally:
+        process.terminate()
+        process.wait()
+    return serving, ready, status
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark sentiment service startup")
+    parser.add_argument("--runs", type=int, default=3, help="Number of cold starts")
+    parser.add_argument("--port", type=int, default=8011, help="Port for the test server")
+    parser.add_argument("--timeout", type=float, default=300, help="Seconds to wait per start")
+    args = parser.parse_args()
+
+    print(f"{'run':<5}{'serving':>10}{'ready':>10}{'load':>10}{'warm-up':>10}")
+    for run in range(1, args.runs + 1):
+        serving, ready, status = measure(args.port, args.timeout)
+        print(f"{run:<5}{serving:>9.2f}s{ready:>9.2f}s"
+              f"{status['load_seconds'] or 0:>9.2f}s{status['warmup_seconds'] or 0:>9.2f}s")
+    print(f"Backend: {status['backend']}")
@@ -0,0 +1,42 @@
+"""
+Time to first byte: streaming versus blocking sentiment responses.
+
+Requests never-seen symbols (cache misses) from /sentiment/{symbol} and
+/sentiment/{symbol}/stream and reports when the first byte and the full
+response arrived.
+
+Usage:
+    python benchmark_stream.py [--url http://localhost:8001] [--limit 50] [--runs 3]
+"""
+import argparse
+import time
+import uuid
+
+import httpx
+
+def timed(client, path):
+    """(seconds to first byte, seconds to last byte) for a GET."""
+    start = time.perf_counter()
+    first = None
+    with client.stream("GET", path) as response:
+        response.raise_for_status()
+        for chunk in response.iter_bytes():
+            if first is None and chunk:
+                first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming vs blocking time to first byte")
+    parser.add_argument("--url", default="http://localhost:8001", help="Sentiment service URL")
+    parser.add_argument("--limit", type=int, default=50, help="Headlines per response")
+    parser.add_argument("--runs", type=int, default=3, help="Misses per endpoint")
+    args = parser.parse_args()
+
+    with httpx.Client(base_url=args.url, timeout=300) as client:
+        print(f"{'endpoint':<12}{'ttfb':>10}{'total':>10}")
+        for name, suffix in (("blocking", ""), ("ndjson", "/stream"), ("sse", "/stream?format=sse")):
+            for _ in range(args.runs):
+                symbol = f"ST{uuid.uuid4().hex[:6].upper()}"
+                sep = "&" if "?" in suffix else "?"
+                first, total = timed(client, f"/sentiment/{symbol}{suffix}{sep}limit={args.limit}")
+                print(f"{name:<12}{first:>9.2f}s{total:>9.2f}s")
@@ -0,0 +1,105 @@
+"""
+Benchmark memory use as uvicorn workers scale, with and without a model host.
+
+For each worker count, starts the service with every worker loading its own
+model, then again with one model_host.py process serving all workers, waits
+until the workers are ready and sums the resident memory of the whole
+process tree (Linux /proc).
+
+Usage:
+    python benchmark_workers.py [--workers 1 2 4] [--port 8012] [--timeout 300]
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# The host only serves from a directory private to its user (mkdtemp is 0700)
+HOST_DIR = tempfile.mkdtemp(prefix="sentiment-model-host-")
+HOST_ADDRESS = os.path.join(HOST_DIR, "host.sock")
+
+def rss_mb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def process_tree(root):
+    """PIDs of root and all its descendants."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            except OSError:
+                continue
+            children.setdefault(ppid, []).append(int(entry))
+    tree, stack = [], [root]
+    while stack:
+        pid = stack.pop()
+        tree.append(pid)
+        stack.extend(children.get(pid, []))
+    return tree
+
+def wait_ready(port, workers, deadline):
+    """Wait until /ready answers 200 several times in a row (requests spread over workers)."""
+    streak = 0
+    with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=5) as client:
+        while streak < 4 * workers:
+            if time.monotonic() > deadline:
+                raise TimeoutError("workers not ready before timeout")
+            try:
+                ok = client.get("/ready").status_code == 200
+            except httpx.TransportError:
+                ok = False
+            streak = streak + 1 if ok else 0
+            time.sleep(0.05 if ok else 0.5)
+
+def measure(workers, use_host, port, timeout):
+    """Total RSS in MB of the service (and model host) once ready."""
+    env = dict(os.environ, PREFETCH_ENABLED="0")
+    processes = []
+    if use_host:
+        env["SENTIMENT_MODEL_HOST"] = HOST_ADDRESS
+        processes.append(subprocess.Popen(
+            [sys.executable, "model_host.py", "--address", HOST_ADDRESS],
+            cwd=HERE, env=env, stdout=subprocess.DEVNULL,
+        ))
+    else:
+        env.pop("SENTIMENT_MODEL_HOST", None)
+    processes.append(subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=HERE, env=env, stdout=subprocess.DEVNULL,
+    ))
+    try:
+        wait_ready(port, workers, time.monotonic() + timeout)
+        return sum(rss_mb(pid) for process in processes for pid in process_tree(process.pid))
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            process.wait()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory use of sentiment workers")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts")
+    parser.add_argument("--port", type=int, default=8012, help="Port for the test server")
+    parser.add_argument("--timeout", type=float, default=300, help="Seconds to wait per start")
+    args = parser.parse_args()
+
+    print(f"{'workers':<9}{'per-worker model':>18}{'model host':>14}")
+    try:
+        for workers in args.workers:
+            local = measure(workers, False, args.port, args.timeout)
+            hosted = measure(workers, True, args.port, args.timeout)
+            print(f"{workers:<9}{local:>15.0f} MB{hosted:>11.0f} MB")
+    finally:
+        shutil.rmtree(HOST_DIR, ignore_errors=True)
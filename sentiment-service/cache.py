@@ -1,64 +1,353 @@
 import os
+import time
+import asyncio
+import hashlib
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from cachetools import TTLCache, cached
+from cachetools import LRUCache
 from datetime import datetime
 
+import store
+
 # Load environment variables
 load_dotenv()
 
-# Create a time-to-live cache
+# Per-symbol results cache
 # maxsize: maximum number of items to store
 # ttl: time-to-live in seconds before cache invalidation
+# Entries are (computed_at, results) so results warm-loaded from the
+# persistent store keep their original age.
 cache_ttl = int(os.getenv("CACHE_TTL_SECONDS", 3600))
-cache = TTLCache(maxsize=1000, ttl=cache_ttl)
+cache = LRUCache(maxsize=1000)
+cache_lock = threading.Lock()
+
+# Stale-while-revalidate: entries up to this many seconds past their TTL are
+# still served immediately while one background refresh replaces them
+stale_seconds = int(os.getenv("CACHE_STALE_SECONDS", 86400))
+
+# Single-flight: at most one refresh per symbol runs at a time in this
+# process; concurrent callers await the same task
+inflight = {}
+refresh_stats = {"refreshes": 0, "coalesced": 0, "stale_served": 0, "failures": 0}
+
+# User requests per symbol, used by the prefetcher to find hot symbols.
+# Maps symbol -> (count, last request time); counts decay with a half-life of
+# HOT_HALF_LIFE_SECONDS so symbols nobody asks for any more cool off. Only
+# requests that returned headlines count (typos and made-up symbols never
+# become hot), and at most HOT_MAX_SYMBOLS symbols are tracked.
+hot_half_life = float(os.getenv("HOT_HALF_LIFE_SECONDS", 6 * 3600))
+hot_max_symbols = int(os.getenv("HOT_MAX_SYMBOLS", 1000))
+request_counts = {}
+
+# Model inference runs in its own bounded pool so a burst of misses can't
+# starve the event loop or the default thread pool. Sized so workers times
+# torch threads per worker covers the cores (one worker using every core by
+# default, one per core with SENTIMENT_NUM_THREADS=1).
+cpu_count = os.cpu_count() or 1
+inference_workers = int(os.getenv("SENTIMENT_INFERENCE_WORKERS", 0)) or max(
+    1, cpu_count // (int(os.getenv("SENTIMENT_NUM_THREADS", 0)) or cpu_count)
+)
+inference_executor = ThreadPoolExecutor(max_workers=inference_workers, thread_name_prefix="inference")
 
-@cached(cache)
-def get_cached_sentiment(symbol: str):
+# Rows older than this are dropped from the persistent store at startup
+retention_seconds = float(os.getenv("SENTIMENT_DB_RETENTION_DAYS", 30)) * 86400
+
+# Second-level cache of model outputs per headline, keyed by a hash of the
+# normalized title. A headline's sentiment doesn't change, so entries only
+# leave by LRU eviction; the same story under several tickers or after the
+# symbol TTL expires is scored once.
+headline_cache = LRUCache(maxsize=int(os.getenv("HEADLINE_CACHE_SIZE", 50000)))
+headline_lock = threading.Lock()
+headline_stats = {"seen": 0, "scored": 0}
+
+def headline_key(title: str) -> str:
+    """Hash of a headline after Unicode, case and whitespace normalization."""
+    normalized = " ".join(unicodedata.normalize("NFKC", title or "").casefold().split())
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+def lookup_headlines(titles):
     """
-    Get sentiment analysis for a stock symbol, with caching.
+    Look up cached model outputs for a list of headlines.
+    
+    Titles missing from memory are looked up in the persistent store, so
+    headlines scored by another worker or before a restart are reused.
     
-    Args:
-        symbol: Stock ticker symbol (e.g., 'AAPL')
-        
     Returns:
-        List of dictionaries with headline info and sentiment scores
+        (keys, cached): the key of each title, and a dict of key -> result
+        for the titles already scored
     """
-    # Import here to avoid circular imports
-    from scraper import fetch_headlines
+    keys = [headline_key(title) for title in titles]
+    with headline_lock:
+        found = {key: headline_cache[key] for key in set(keys) if key in headline_cache}
+        headline_stats["seen"] += len(titles)
+    
+    missing = set(keys) - set(found)
+    if missing:
+        stored = store.get_headlines(missing)
+        with headline_lock:
+            headline_cache.update(stored)
+        found.update(stored)
+    return keys, found
+
+def store_headlines(keys, results):
+    """Cache freshly computed model outputs and count them as inferences."""
+    with headline_lock:
+        for key, result in zip(keys, results):
+            headline_cache[key] = result
+        headline_stats["scored"] += len(keys)
+    store.put_headlines(keys, results)
+
+def _is_fresh(entry):
+    return entry is not None and time.time() - entry[0] < cache_ttl
+
+def _is_servable(entry):
+    return entry is not None and time.time() - entry[0] < cache_ttl + stale_seconds
+
+async def get_entry(symbol: str):
+    """Newest known (computed_at, results) for a symbol from memory or the persistent store."""
+    with cache_lock:
+        entry = cache.get(symbol)
+    if _is_fresh(entry):
+        return entry
+    return await reload_entry(symbol)
+
+async def reload_entry(symbol: str):
+    """Newest (computed_at, results) for a symbol, checking the persistent store even if memory is fresh."""
+    stored = await asyncio.to_thread(store.get_symbol, symbol)
+    with cache_lock:
+        entry = cache.get(symbol)
+        if stored is not None and (entry is None or stored[0] > entry[0]):
+            # Another worker (or an earlier run) has newer results
+            entry = stored
+            cache[symbol] = entry
+    return entry
+
+def _analyze(articles):
+    # Import here to avoid circular imports; the model itself is loaded on
+    # first use (in this worker thread) unless the startup warm-up got there first
     from analyzer import analyze_headlines
+    return analyze_headlines(articles)
+
+def _iter_analyze(articles):
+    from analyzer import iter_analyze_headlines
+    return iter_analyze_headlines(articles)
+
+async def compute_sentiment(symbol: str, on_batch=None):
+    """
+    Fetch and analyze fresh headlines for a symbol and cache the results.
+    
+    The NewsAPI request is async; the model runs in inference_executor.
+    get_cached_sentiment runs this once per symbol at a time.
+    
+    Args:
+        symbol: Stock ticker symbol
+        on_batch: Optional callback given each list of results as its
+            inference batch completes (used for streaming responses)
+    """
+    from scraper import fetch_headlines_async
     
     print(f"Cache miss for {symbol} at {datetime.now().isoformat()}")
     print(f"Fetching fresh sentiment data (TTL: {cache_ttl}s)...")
     
     # Fetch headlines and analyze sentiment
-    articles = fetch_headlines(symbol)
-    results = analyze_headlines(articles)
+    articles = await fetch_headlines_async(symbol)
+    loop = asyncio.get_running_loop()
+    if on_batch is None:
+        results = await loop.run_in_executor(inference_executor, _analyze, articles)
+    else:
+        # Step the batch generator in the pool, handing each batch over as it completes
+        results = []
+        batches = _iter_analyze(articles)
+        while (batch := await loop.run_in_executor(inference_executor, next, batches, None)) is not None:
+            results.extend(batch)
+            on_batch(batch)
+        results.sort(key=lambda x: abs(x["score"]), reverse=True)
+    
+    entry = (time.time(), results)
+    with cache_lock:
+        cache[symbol] = entry
+    await asyncio.to_thread(store.put_symbol, symbol, results, entry[0])
+    
+    return results
+
+def _decayed(count: float, at: float, now: float) -> float:
+    return count * 0.5 ** ((now - at) / hot_half_life)
+
+def record_request(symbol: str, results):
+    """Count a served request towards the symbol's popularity, if it had headlines."""
+    if not results:
+        return
+    now = time.time()
+    count, at = request_counts.get(symbol, (0.0, now))
+    request_counts[symbol] = (_decayed(count, at, now) + 1.0, now)
+    if len(request_counts) > hot_max_symbols:
+        # Forget the coldest tenth at once, so pruning is rare
+        keep = sorted(request_counts, key=lambda s: _decayed(*request_counts[s], now), reverse=True)
+        for cold in keep[hot_max_symbols * 9 // 10:]:
+            del request_counts[cold]
+
+def most_requested(n: int, min_count: float = 0.0):
+    """
+    The n symbols with the highest decayed request counts.
     
+    Returns:
+        List of (symbol, count) with count at least min_count, hottest first
+    """
+    now = time.time()
+    counts = ((symbol, _decayed(count, at, now)) for symbol, (count, at) in request_counts.items())
+    return sorted((c for c in counts if c[1] >= min_count), key=lambda c: c[1], reverse=True)[:n]
+
+def refresh_symbol(symbol: str, on_batch=None) -> asyncio.Task:
+    """
+    Start a refresh for a symbol, or join the one already running.
+    
+    on_batch is passed to compute_sentiment when a new refresh is started.
+    """
+    task = inflight.get(symbol)
+    if task is not None:
+        refresh_stats["coalesced"] += 1
+        return task
+    
+    refresh_stats["refreshes"] += 1
+    task = asyncio.create_task(compute_sentiment(symbol, on_batch))
+    inflight[symbol] = task
+    
+    def done(task):
+        inflight.pop(symbol, None)
+        # Retrieve the exception so background refresh failures are logged here
+        if not task.cancelled() and task.exception() is not None:
+            refresh_stats["failures"] += 1
+            print(f"Refresh failed for {symbol}: {task.exception()}")
+    
+    task.add_done_callback(done)
+    return task
+
+async def get_cached_sentiment(symbol: str):
+    """
+    Get sentiment analysis for a stock symbol, with caching.
+    
+    Checks the in-memory cache, then the persistent store (shared with other
+    workers). Expired results within CACHE_STALE_SECONDS are returned at once
+    while a background refresh runs; otherwise the caller waits for the
+    refresh. Concurrent misses for a symbol share a single refresh.
+    
+    Args:
+        symbol: Stock ticker symbol (e.g., 'AAPL')
+    
+    Returns:
+        List of dictionaries with headline info and sentiment scores
+    """
+    entry = await get_entry(symbol)
+    if _is_fresh(entry):
+        record_request(symbol, entry[1])
+        return entry[1]
+    
+    task = refresh_symbol(symbol)
+    if _is_servable(entry):
+        refresh_stats["stale_served"] += 1
+        record_request(symbol, entry[1])
+        return entry[1]
+    
+    # shield: a caller disconnecting must not cancel the shared refresh
+    results = await asyncio.shield(task)
+    record_request(symbol, results)
     return results
 
+async def stream_sentiment(symbol: str):
+    """
+    Like get_cached_sentiment, but yields results in batches as they are ready.
+    
+    Cached (or stale) results are yielded at once as one sorted batch. On a
+    miss that this call starts, each inference batch is yielded as soon as
+    it completes, unsorted; joining a refresh already in flight yields its
+    full results when it finishes. The refresh runs as a task, so a client
+    disconnecting mid-stream doesn't stop it from completing and caching.
+    """
+    entry = await get_entry(symbol)
+    if _is_fresh(entry):
+        record_request(symbol, entry[1])
+        yield entry[1]
+        return
+    
+    if symbol in inflight or _is_servable(entry):
+        task = refresh_symbol(symbol)
+        if _is_servable(entry):
+            refresh_stats["stale_served"] += 1
+            results = entry[1]
+        else:
+            results = await asyncio.shield(task)
+        record_request(symbol, results)
+        yield results
+        return
+    
+    batches = asyncio.Queue()
+    task = refresh_symbol(symbol, on_batch=batches.put_nowait)
+    task.add_done_callback(lambda _: batches.put_nowait(None))
+    while (batch := await batches.get()) is not None:
+        yield batch
+    # Raises if the refresh failed
+    record_request(symbol, await asyncio.shield(task))
+    
+def warm_cache():
+    """Load recent results and headlines from the persistent store into memory."""
+    store.prune(retention_seconds)
+    
+    symbols = store.recent_symbols(since=time.time() - cache_ttl, limit=cache.maxsize)
+    headlines = store.recent_headlines(limit=headline_cache.maxsize)
+    with cache_lock:
+        for symbol, updated_at, results in symbols:
+            cache[symbol] = (updated_at, results)
+    with headline_lock:
+        headline_cache.update(headlines)
+    
+    print(f"Warm-loaded {len(symbols)} symbols and {len(headlines)} headlines from {store.db_path}")
+
+def get_headline_cache_stats():
+    """Get headline cache size and how many headlines skipped inference."""
+    with headline_lock:
+        seen, scored = headline_stats["seen"], headline_stats["scored"]
+        size = len(headline_cache)
+    return {
+        "size": size,
+        "maxsize": headline_cache.maxsize,
+        "headlines_seen": seen,
+        "headlines_scored": scored,
+        # Share of headlines answered from the cache or an in-batch duplicate
+        "dedupe_ratio": 1 - scored / seen if seen else 0.0
+    }
+
 def get_cache_stats():
     """Get information about the current cache state."""
+    with cache_lock:
+        keys = [symbol for symbol, entry in cache.items() if _is_fresh(entry)]
     return {
-        "size": len(cache),
+        "size": len(keys),
         "maxsize": cache.maxsize,
-        "ttl": cache.ttl,
+        "ttl": cache_ttl,
         "currsize": cache.currsize,
-        "keys": list(cache.keys())
+        "keys": keys,
+        "headlines": get_headline_cache_stats(),
+        "refresh": dict(refresh_stats, inflight=len(inflight))
     }
 
 if __name__ == "__main__":
     # Simple test to verify caching functionality
     test_symbol = "AAPL"
     
-    # First call should hit the API
-    print(f"First call for {test_symbol}:")
-    results1 = get_cached_sentiment(test_symbol)
-    print(f"Got {len(results1)} results")
+    async def main():
+        # First call should hit the API
+        print(f"First call for {test_symbol}:")
+        results1 = await get_cached_sentiment(test_symbol)
+        print(f"Got {len(results1)} results")
+        
+        # Second call should use the cache
+        print(f"\nSecond call for {test_symbol}:")
+        results2 = await get_cached_sentiment(test_symbol)
+        print(f"Got {len(results2)} results")
     
-    # Second call should use the cache
-    print(f"\nSecond call for {test_symbol}:")
-    results2 = get_cached_sentiment(test_symbol)
-    print(f"Got {len(results2)} results")
+    asyncio.run(main())
     
     # Show cache stats
     print("\nCache stats:", get_cache_stats())
@@ -0,0 +1,95 @@
+"""
+Accuracy parity check: quantized ONNX backend versus the PyTorch model.
+
+Scores a fixed set of financial headlines with both backends and compares
+labels and class probabilities. Exits non-zero if label agreement is below
+--min-agreement, so it can gate a new export.
+
+Usage:
+    SENTIMENT_ONNX_MODEL=models/finbert-onnx/model.int8.onnx \
+        python check_onnx_parity.py [--min-agreement 0.95]
+"""
+import argparse
+import sys
+
+import numpy as np
+
+import analyzer
+
+HEADLINES = [
+    "Apple shares rise after earnings beat expectations",
+    "Microsoft stock falls as cloud guidance disappoints investors",
+    "Nvidia hits record high on surging data center demand",
+    "Tesla recalls 120,000 vehicles over faulty seat belts",
+    "Amazon announces $10 billion share buyback",
+    "Alphabet faces antitrust probe in the European Union",
+    "Meta cuts 10,000 jobs in second round of layoffs",
+    "Intel warns of weaker quarter as PC demand slumps",
+    "Netflix subscriber growth tops forecasts",
+    "Boeing deliveries halted after new quality issue",
+    "JPMorgan raises dividend after passing stress test",
+    "Bank shares slide as deposit outflows accelerate",
+    "Oil prices climb as OPEC extends supply cuts",
+    "Gold steadies ahead of Federal Reserve decision",
+    "Fed holds rates steady, signals cuts later this year",
+    "Inflation cools more than expected in March",
+    "Retail sales unexpectedly decline for second month",
+    "Unemployment claims rise to highest level since 2021",
+    "AMD unveils new AI chip to challenge Nvidia",
+    "Pfizer cuts full-year revenue outlook on lower COVID sales",
+    "Moderna stock jumps on positive cancer vaccine data",
+    "Walmart raises annual forecast as shoppers seek bargains",
+    "Target shares plunge after profit miss",
+    "Disney to cut $5.5 billion in costs and 7,000 jobs",
+    "Ford reports quarterly loss on EV unit",
+    "General Motors reaffirms guidance despite strike costs",
+    "Coinbase sued by SEC over unregistered securities",
+    "Bitcoin rebounds above $30,000",
+    "Salesforce beats estimates and lifts profit outlook",
+    "Zoom revenue growth slows to single digits",
+    "Starbucks same-store sales miss in China",
+    "Nike shares fall on weak North America demand",
+    "Visa quarterly revenue rises 11% on strong payments volume",
+    "PayPal shares sink as margins shrink",
+    "Exxon posts record annual profit",
+    "Chevron to acquire Hess in $53 billion deal",
+    "Credit Suisse shares tumble to all-time low",
+    "UBS agrees to buy Credit Suisse in rescue deal",
+    "Company reports results in line with estimates",
+    "Board schedules annual shareholder meeting for May",
+]
+
+def compare(reference, candidate, texts):
+    """Label agreement and largest top-class probability gap between two backends."""
+    expected = analyzer.score_texts(texts, backend=reference)
+    actual = analyzer.score_texts(texts, backend=candidate)
+    agree = [e["label"] == a["label"] for e, a in zip(expected, actual)]
+    gaps = [abs(e["score"] - a["score"]) for e, a in zip(expected, actual)]
+    return expected, actual, float(np.mean(agree)), max(gaps)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare ONNX and PyTorch sentiment outputs")
+    parser.add_argument("--min-agreement", type=float, default=0.95,
+                        help="Minimum share of headlines with the same label")
+    args = parser.parse_args()
+
+    # Reuse the backend analyzer loads by default
+    loaded = {analyzer.BACKEND: analyzer.get_backend()}
+    torch_backend = loaded.get("torch") or analyzer.TorchBackend()
+    onnx_backend = loaded.get("onnx") or analyzer.OnnxBackend()
+    expected, actual, agreement, max_gap = compare(torch_backend, onnx_backend, HEADLINES)
+
+    for text, e, a in zip(HEADLINES, expected, actual):
+        if e["label"] != a["label"]:
+            print(f"MISMATCH {text!r}: torch {e['label']} {e['score']:.3f}, "
+                  f"onnx {a['label']} {a['score']:.3f}")
+
+    print(f"ONNX model: {analyzer.ONNX_MODEL_PATH}")
+    print(f"Headlines: {len(HEADLINES)}")
+    print(f"Label agreement:        {agreement:.1%}")
+    print(f"Max score difference:   {max_gap:.4f}")
+
+    if agreement < args.min_agreement:
+        print(f"FAILED: agreement below {args.min_agreement:.0%}")
+        sys.exit(1)
+    print("PASSED")
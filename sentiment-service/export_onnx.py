@@ -0,0 +1,66 @@
+"""
+Export the sentiment model to ONNX and quantize it for ONNX Runtime.
+
+Writes model.onnx (fp32), model.int8.onnx (dynamic INT8 quantization of the
+linear layers) and the tokenizer/config files into one directory, so
+SENTIMENT_BACKEND=onnx can load everything offline from
+SENTIMENT_ONNX_MODEL.
+
+Usage:
+    python export_onnx.py [--model yjernite/finbert-tone] [--output models/finbert-onnx]
+"""
+import argparse
+import os
+
+import torch
+from onnxruntime.quantization import QuantType, quantize_dynamic
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+def export(model_name, output_dir, opset=14):
+    """
+    Export and quantize a sequence classification model.
+
+    Returns:
+        (fp32 path, int8 path)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+
+    # Batch and sequence length stay dynamic so length-bucketed batches of
+    # any shape can be fed
+    sample = tokenizer(["Shares rise after earnings beat"], return_tensors="pt")
+    input_names = list(sample.keys())
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    fp32_path = os.path.join(output_dir, "model.onnx")
+    with torch.inference_mode():
+        torch.onnx.export(
+            model,
+            (dict(sample),),
+            fp32_path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+
+    int8_path = os.path.join(output_dir, "model.int8.onnx")
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+
+    tokenizer.save_pretrained(output_dir)
+    model.config.save_pretrained(output_dir)
+    return fp32_path, int8_path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the sentiment model to quantized ONNX")
+    parser.add_argument("--model", default=os.getenv("SENTIMENT_MODEL", "yjernite/finbert-tone"),
+                        help="Hugging Face model name or local path")
+    parser.add_argument("--output", default="models/finbert-onnx", help="Output directory")
+    parser.add_argument("--opset", type=int, default=14, help="ONNX opset version")
+    args = parser.parse_args()
+
+    fp32_path, int8_path = export(args.model, args.output, args.opset)
+    for path in (fp32_path, int8_path):
+        print(f"{path}: {os.path.getsize(path) / 1e6:.1f} MB")
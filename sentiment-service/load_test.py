@@ -0,0 +1,83 @@
+"""
+Load test: latency of cached symbols while cache misses are being computed.
+
+Measures /sentiment/{symbol} latency for an already cached symbol, first on
+an idle service and then while a burst of requests for uncached symbols
+(each a NewsAPI fetch plus a model run) is in flight. With blocking work
+off the event loop, the cached p99 should stay roughly flat.
+
+Usage:
+    python load_test.py [--url http://localhost:8001] [--cached AAPL]
+                        [--misses 20] [--concurrency 8] [--duration 5]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return float("nan")
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+async def hammer(client, symbol, stop_at, latencies):
+    """Request a symbol back to back until stop_at, recording latencies in ms."""
+    while time.perf_counter() < stop_at:
+        start = time.perf_counter()
+        response = await client.get(f"/sentiment/{symbol}")
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+async def measure(client, symbol, concurrency, duration):
+    latencies = []
+    stop_at = time.perf_counter() + duration
+    await asyncio.gather(*(hammer(client, symbol, stop_at, latencies) for _ in range(concurrency)))
+    return latencies
+
+async def miss_burst(client, count):
+    """Request `count` never-seen symbols at once; returns seconds until all finish."""
+    run_id = uuid.uuid4().hex[:4].upper()
+    start = time.perf_counter()
+    responses = await asyncio.gather(
+        *(client.get(f"/sentiment/LT{run_id}{i}") for i in range(count)),
+        return_exceptions=True,
+    )
+    failed = sum(1 for r in responses if isinstance(r, Exception) or r.status_code != 200)
+    return time.perf_counter() - start, failed
+
+def report(name, latencies):
+    print(f"{name:<24} n={len(latencies):<6} "
+          f"p50={percentile(latencies, 50):7.1f}ms  "
+          f"p95={percentile(latencies, 95):7.1f}ms  "
+          f"p99={percentile(latencies, 99):7.1f}ms  "
+          f"max={max(latencies, default=float('nan')):7.1f}ms")
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.concurrency + args.misses)
+    async with httpx.AsyncClient(base_url=args.url, timeout=300, limits=limits) as client:
+        # Make sure the cached symbol really is cached
+        (await client.get(f"/sentiment/{args.cached}")).raise_for_status()
+
+        idle = await measure(client, args.cached, args.concurrency, args.duration)
+
+        burst = asyncio.create_task(miss_burst(client, args.misses))
+        busy = await measure(client, args.cached, args.concurrency, args.duration)
+        burst_seconds, failed = await burst
+
+    print(f"\nCached symbol {args.cached}, {args.concurrency} concurrent clients, "
+          f"{args.duration}s per phase")
+    report("idle", idle)
+    report(f"during {args.misses} misses", busy)
+    print(f"Miss burst finished in {burst_seconds:.2f}s ({failed} failed)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cached-symbol latency under concurrent misses")
+    parser.add_argument("--url", default="http://localhost:8001", help="Sentiment service URL")
+    parser.add_argument("--cached", default="AAPL", help="Symbol to keep cached")
+    parser.add_argument("--misses", type=int, default=20, help="Uncached symbols to request at once")
+    parser.add_argument("--concurrency", type=int, default=8, help="Clients requesting the cached symbol")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per phase")
+    asyncio.run(main(parser.parse_args()))
@@ -1,16 +1,27 @@
 import os
+import json
+import asyncio
 from typing import List, Dict, Optional
 from datetime import datetime
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 # Load environment variables
 load_dotenv()
 
 # Import cache module
-from cache import get_cached_sentiment, get_cache_stats
+from cache import get_cached_sentiment, stream_sentiment, get_cache_stats, warm_cache, inference_executor
+from scraper import close_async_client
+import analyzer
+import model_host
+import prefetch
+
+# Load and warm the model in the background at startup; when disabled it is
+# loaded by the first cache miss instead
+warmup_enabled = os.getenv("SENTIMENT_WARMUP", "1") == "1"
 
 # Define Pydantic models for request/response validation
 class SentimentItem(BaseModel):
@@ -27,12 +38,48 @@ class SentimentResponse(BaseModel):
     avg_score: float
     sentiment_summary: str
     
+class HeadlineCacheStats(BaseModel):
+    size: int
+    maxsize: int
+    headlines_seen: int
+    headlines_scored: int
+    dedupe_ratio: float
+
+class RefreshStats(BaseModel):
+    refreshes: int
+    coalesced: int
+    stale_served: int
+    failures: int
+    inflight: int
+
+class PrefetchStats(BaseModel):
+    enabled: bool
+    watchlist: List[str]
+    hot: List[str]
+    refreshes: int
+    failures: int
+    skipped: int
+    last_symbol: Optional[str] = None
+
 class CacheStatsResponse(BaseModel):
     size: int
     maxsize: int
     ttl: int
     currsize: int
     keys: List[str]
+    headlines: HeadlineCacheStats
+    refresh: RefreshStats
+    prefetch: PrefetchStats
+
+class ReadinessResponse(BaseModel):
+    ready: bool
+    backend: Optional[str] = None
+    loaded: bool
+    warm: bool
+    load_seconds: Optional[float] = None
+    warmup_seconds: Optional[float] = None
+    error: Optional[str] = None
+    model_host: Optional[str] = None
 
 # Create FastAPI app
 app = FastAPI(
@@ -50,6 +97,51 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Background prefetch loop and model warm-up, started with the app
+prefetch_task = None
+warmup_task = None
+# A failed warm-up is retried after this delay, doubling up to the maximum
+WARMUP_RETRY_SECONDS = 5.0
+WARMUP_MAX_RETRY_SECONDS = 60.0
+
+async def warm_model():
+    """
+    Load the model and run a dummy batch without holding up startup, or
+    connect to the model host when SENTIMENT_MODEL_HOST is set. Failures
+    are retried with backoff, so /ready recovers once the model (or host)
+    becomes available.
+    """
+    loop = asyncio.get_running_loop()
+    warm = model_host.get_client if model_host.MODEL_HOST else analyzer.warm_up
+    delay = WARMUP_RETRY_SECONDS
+    while True:
+        try:
+            await loop.run_in_executor(inference_executor, warm)
+            return
+        except Exception as e:
+            print(f"Model warm-up failed, retrying in {delay:.0f}s: {e}")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, WARMUP_MAX_RETRY_SECONDS)
+
+@app.on_event("startup")
+async def startup():
+    global prefetch_task, warmup_task
+    # Serve results persisted by earlier runs (or other workers) immediately
+    warm_cache()
+    if warmup_enabled:
+        warmup_task = asyncio.create_task(warm_model())
+    # Keep watchlist and hot symbols refreshed ahead of their TTL
+    if prefetch.enabled:
+        prefetch_task = asyncio.create_task(prefetch.run_prefetcher())
+
+@app.on_event("shutdown")
+async def shutdown():
+    for task in (prefetch_task, warmup_task):
+        if task is not None:
+            task.cancel()
+    await close_async_client()
+    inference_executor.shutdown(wait=False, cancel_futures=True)
+
 # Define routes
 @app.get("/")
 async def root():
@@ -58,7 +150,9 @@ async def root():
         "version": "1.0.0",
         "endpoints": [
             "/sentiment/{symbol}",
-            "/cache/stats"
+            "/sentiment/{symbol}/stream",
+            "/cache/stats",
+            "/ready"
         ]
     }
 
@@ -73,7 +167,7 @@ async def sentiment(symbol: str, limit: int = Query(10, ge=1, le=50)):
     """
     try:
         # Get sentiment data with caching
-        results = get_cached_sentiment(symbol.upper())
+        results = await get_cached_sentiment(symbol.upper())
         
         # Limit the number of results
         results = results[:limit]
@@ -98,10 +192,86 @@ async def sentiment(symbol: str, limit: int = Query(10, ge=1, le=50)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Sentiment fetch error: {str(e)}")
 
+@app.get("/sentiment/{symbol}/stream")
+async def sentiment_stream(
+    symbol: str,
+    limit: int = Query(10, ge=1, le=50),
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+):
+    """
+    Stream sentiment analysis for news about a stock.
+    
+    Emits one record per headline as soon as its inference batch completes,
+    then a summary record with avg_score and sentiment_summary over the
+    emitted headlines. Cached results arrive strongest first (the same
+    headlines as /sentiment/{symbol}); on a miss they arrive in the order
+    they are scored and the first `limit` are sent.
+    
+    Args:
+        symbol: Stock ticker symbol (e.g., 'AAPL')
+        limit: Maximum number of headlines to stream (default 10, max 50)
+        format: 'ndjson' (one JSON object per line) or 'sse' (server-sent events)
+    """
+    symbol = symbol.upper()
+    
+    def encode(record):
+        if format == "sse":
+            return f"event: {record['type']}\ndata: {json.dumps(record)}\n\n"
+        return json.dumps(record) + "\n"
+    
+    async def records():
+        scores = []
+        try:
+            async for batch in stream_sentiment(symbol):
+                for item in batch[:limit - len(scores)]:
+                    scores.append(item["score"])
+                    yield encode(dict(item, type="headline"))
+                if len(scores) >= limit:
+                    # The refresh keeps running in the background and is cached
+                    break
+        except Exception as e:
+            # Headers are already sent, so errors are reported in-band
+            yield encode({"type": "error", "detail": f"Sentiment fetch error: {str(e)}"})
+            return
+        
+        avg_score = sum(scores) / len(scores) if scores else 0.0
+        yield encode({
+            "type": "summary",
+            "symbol": symbol,
+            "timestamp": datetime.now().isoformat(),
+            "count": len(scores),
+            "avg_score": avg_score,
+            "sentiment_summary": get_sentiment_summary(avg_score)
+        })
+    
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(records(), media_type=media_type)
+
 @app.get("/cache/stats", response_model=CacheStatsResponse)
 async def cache_stats():
     """Get current cache statistics."""
-    return get_cache_stats()
+    return dict(get_cache_stats(), prefetch=prefetch.get_prefetch_stats())
+
+@app.get("/ready", response_model=ReadinessResponse)
+async def ready(response: Response):
+    """
+    Readiness probe.
+    
+    Returns 503 until the model has been loaded and warmed up, so a load
+    balancer only routes traffic once misses won't pay the model load. With
+    SENTIMENT_WARMUP=0 the service is ready at once and loads on first use.
+    A failed warm-up is retried in the background, and a model that loads
+    and scores on first use also counts as warm. Workers using a model host
+    report the host's state.
+    """
+    if model_host.MODEL_HOST:
+        status = await asyncio.to_thread(model_host.get_status)
+    else:
+        status = analyzer.get_model_status()
+    status["ready"] = status["warm"] or not warmup_enabled
+    if not status["ready"]:
+        response.status_code = 503
+    return status
 
 def get_sentiment_summary(score: float) -> str:
     """Generate a human-readable summary of sentiment score."""
@@ -0,0 +1,296 @@
+"""
+Model host: one process owns the sentiment model for every HTTP worker.
+
+Run it next to the service and point the workers at it:
+
+    python model_host.py
+    SENTIMENT_MODEL_HOST=/tmp/sentiment-model-host-$(id -u)/host.sock uvicorn main:app --workers 8
+
+Workers then never import torch or load weights, so memory stays roughly
+flat as workers are added. Requests from all workers go through one
+inference thread, which merges whatever is queued into a single
+score_texts call so concurrent small batches share forward passes.
+
+The manager unpickles whatever arrives on its socket (and workers unpickle
+the replies), so a connection that authenticates can run code on the other
+side. Unix sockets live in a directory only their owner can use, next to a
+random key the host writes at startup; listening on TCP requires an
+explicit SENTIMENT_MODEL_HOST_AUTHKEY.
+"""
+import os
+import sys
+import stat
+import time
+import queue
+import socket
+import secrets
+import tempfile
+import threading
+from concurrent.futures import Future
+from multiprocessing.managers import BaseManager
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Model host settings
+# MODEL_HOST: Unix socket path (or host:port) the host listens on; empty
+#   means every worker loads its own model
+# MODEL_HOST_AUTHKEY: shared secret for worker connections; required for TCP
+# MODEL_HOST_MAX_BATCH: most headlines merged into one score_texts call
+# MODEL_HOST_CONNECT_TIMEOUT: seconds a worker waits for the host to come up
+MODEL_HOST = os.getenv("SENTIMENT_MODEL_HOST", "")
+AUTHKEY = os.getenv("SENTIMENT_MODEL_HOST_AUTHKEY", "")
+MAX_BATCH = int(os.getenv("SENTIMENT_MODEL_HOST_MAX_BATCH", 256))
+CONNECT_TIMEOUT = float(os.getenv("SENTIMENT_MODEL_HOST_CONNECT_TIMEOUT", 120))
+
+DEFAULT_ADDRESS = os.path.join(
+    os.getenv("XDG_RUNTIME_DIR") or tempfile.gettempdir(),
+    f"sentiment-model-host-{os.getuid()}",
+    "host.sock",
+)
+
+def parse_address(value):
+    """'host:port' -> (host, port); anything else is a Unix socket path."""
+    host, sep, port = value.rpartition(":")
+    if sep and port.isdigit():
+        return (host or "127.0.0.1", int(port))
+    return value
+
+def key_path(address):
+    """Where the host keeps the generated secret for a Unix socket."""
+    return f"{address}.key"
+
+def private_dir(path, create=False):
+    """
+    Check that a socket's directory is owned by us and closed to everyone else.
+    
+    Anyone who can write to the directory could put their own socket (or key)
+    there, so the host refuses to serve, and workers to connect, otherwise.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    if create:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise RuntimeError(
+            f"Model host directory {directory} must be a directory owned by this user "
+            f"with mode 0700; remove it or choose another socket path"
+        )
+    return directory
+
+def authkey_for(address):
+    """
+    The connection secret for an address.
+    
+    TCP addresses need SENTIMENT_MODEL_HOST_AUTHKEY; Unix sockets use it if
+    set, otherwise the key the host wrote next to the socket.
+    """
+    if isinstance(parse_address(address), tuple):
+        if not AUTHKEY:
+            raise RuntimeError(
+                f"Refusing to use model host over TCP ({address}) without SENTIMENT_MODEL_HOST_AUTHKEY; "
+                f"set a random secret on the host and the workers, or use a Unix socket path"
+            )
+        return AUTHKEY.encode()
+    private_dir(address)
+    if AUTHKEY:
+        return AUTHKEY.encode()
+    with open(key_path(address), "rb") as f:
+        return f.read()
+
+def write_key(address):
+    """Generate a fresh secret for a Unix socket, readable by its owner only."""
+    path = key_path(address)
+    tmp = f"{path}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(secrets.token_hex(32).encode())
+    os.replace(tmp, path)
+
+def remove_stale_socket(address):
+    """
+    Unlink a socket left behind by a host that died, so binding doesn't fail.
+    
+    Only our own sockets that refuse connections are removed; a live host on
+    the address, or anything else at that path, is an error.
+    """
+    try:
+        info = os.lstat(address)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid():
+        raise RuntimeError(f"{address} exists and is not a model host socket of this user")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(address)
+    except ConnectionRefusedError:
+        os.remove(address)
+        return
+    finally:
+        probe.close()
+    raise RuntimeError(f"Another model host is already serving on {address}")
+
+class ModelHost:
+    """Scores headlines for all workers, merging queued requests into shared batches."""
+    
+    def __init__(self):
+        self.requests = queue.Queue()
+        self.stats = {"requests": 0, "headlines": 0, "batches": 0}
+        threading.Thread(target=self._run, name="model-host", daemon=True).start()
+    
+    def score(self, texts):
+        """Score a list of headlines; blocks the calling connection's thread."""
+        future = Future()
+        self.requests.put((list(texts), future))
+        return future.result()
+    
+    def status(self):
+        import analyzer
+        return dict(analyzer.get_model_status(), **self.stats, pid=os.getpid())
+    
+    def _run(self):
+        import analyzer
+    
+        while True:
+            pending = [self.requests.get()]
+            size = len(pending[0][0])
+            # Take whatever else is already queued, up to MAX_BATCH headlines
+            while size < MAX_BATCH:
+                try:
+                    item = self.requests.get_nowait()
+                except queue.Empty:
+                    break
+                pending.append(item)
+                size += len(item[0])
+    
+            texts = [text for batch, _ in pending for text in batch]
+            try:
+                results = analyzer.score_texts(texts)
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+    
+            self.stats["requests"] += len(pending)
+            self.stats["headlines"] += len(texts)
+            self.stats["batches"] += 1
+            start = 0
+            for batch, future in pending:
+                future.set_result(results[start:start + len(batch)])
+                start += len(batch)
+
+class HostManager(BaseManager):
+    pass
+
+# Per-process client; proxies open one connection per calling thread
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """
+    Connect to the model host, waiting up to CONNECT_TIMEOUT for it to start.
+    
+    Returns:
+        Proxy with score(texts) and status() methods
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            HostManager.register("ModelHost")
+            deadline = time.monotonic() + CONNECT_TIMEOUT
+            while True:
+                try:
+                    # Read the key on every attempt; a restarted host writes a new one
+                    manager = HostManager(address=parse_address(MODEL_HOST), authkey=authkey_for(MODEL_HOST))
+                    manager.connect()
+                    break
+                except (ConnectionRefusedError, FileNotFoundError):
+                    if time.monotonic() > deadline:
+                        raise
+                    time.sleep(0.5)
+            _client = manager.ModelHost()
+        return _client
+
+def score(texts):
+    """Score headlines on the model host, reconnecting once if it restarted."""
+    global _client
+    try:
+        return get_client().score(texts)
+    except (EOFError, ConnectionError):
+        with _client_lock:
+            _client = None
+        return get_client().score(texts)
+
+def get_status():
+    """The host's model status, without waiting for a host that isn't up yet."""
+    status = {"backend": None, "loaded": False, "warm": False, "model_host": MODEL_HOST}
+    if _client is None:
+        return dict(status, error="Not connected to model host")
+    try:
+        return dict(status, **_client.status())
+    except Exception as e:
+        return dict(status, error=f"Model host unavailable: {e}")
+
+def prepare(address):
+    """
+    Check an address can be served and return its authkey.
+    
+    For a Unix socket this creates (or checks) its private directory, clears
+    a stale socket and writes a fresh key.
+    """
+    if isinstance(parse_address(address), tuple):
+        return authkey_for(address)
+    private_dir(address, create=True)
+    remove_stale_socket(address)
+    if not AUTHKEY:
+        write_key(address)
+    return authkey_for(address)
+
+def serve(address, authkey=None):
+    """Load and warm the model, then serve workers until interrupted."""
+    import signal
+    import analyzer
+    
+    # Refuse an unusable address before spending time on the model
+    if authkey is None:
+        authkey = prepare(address)
+    unix = not isinstance(parse_address(address), tuple)
+    analyzer.warm_up()
+    host = ModelHost()
+    HostManager.register("ModelHost", callable=lambda: host)
+    manager = HostManager(address=parse_address(address), authkey=authkey)
+    if unix:
+        # A host may have died (or started) while the model was loading
+        remove_stale_socket(address)
+    # Unix sockets are created owner-only (no window before a chmod)
+    umask = os.umask(0o177)
+    try:
+        server = manager.get_server()
+    finally:
+        os.umask(umask)
+    # Exit through serve_forever's cleanup on SIGTERM too, so the socket and key are removed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"Model host (pid {os.getpid()}) serving {analyzer.BACKEND} model on {address}")
+    try:
+        server.serve_forever()
+    finally:
+        # The listener unlinks its own socket at exit; the key is ours
+        if unix and os.path.exists(key_path(address)):
+            os.remove(key_path(address))
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Serve the sentiment model to HTTP workers")
+    parser.add_argument("--address", default=MODEL_HOST or DEFAULT_ADDRESS,
+                        help="Unix socket path (in a private directory) or host:port to listen on "
+                             "(TCP needs SENTIMENT_MODEL_HOST_AUTHKEY)")
+    args = parser.parse_args()
+    try:
+        authkey = prepare(args.address)
+    except RuntimeError as e:
+        raise SystemExit(str(e))
+    serve(args.address, authkey)
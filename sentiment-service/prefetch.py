@@ -0,0 +1,122 @@
+import os
+import time
+import asyncio
+from dotenv import load_dotenv
+
+import cache
+import store
+
+# Load environment variables
+load_dotenv()
+
+# Prefetch settings
+# WATCHLIST: symbols always kept warm (comma separated)
+# TOP_N: also keep the N most requested symbols warm
+# MIN_REQUESTS: decayed request count a symbol needs to count as hot
+# LEAD_SECONDS: refresh this long before an entry's TTL lapses
+# MIN_INTERVAL_SECONDS: minimum gap between prefetch refreshes (NewsAPI rate limit)
+enabled = os.getenv("PREFETCH_ENABLED", "1") == "1"
+watchlist = [s.strip().upper() for s in os.getenv("PREFETCH_WATCHLIST", "").split(",") if s.strip()]
+top_n = int(os.getenv("PREFETCH_TOP_N", 10))
+min_requests = float(os.getenv("PREFETCH_MIN_REQUESTS", 2.0))
+lead_seconds = float(os.getenv("PREFETCH_LEAD_SECONDS", cache.cache_ttl * 0.1))
+min_interval = float(os.getenv("PREFETCH_MIN_INTERVAL_SECONDS", 2.0))
+
+# Longest sleep between checks, so new hot symbols are picked up promptly
+MAX_IDLE_SECONDS = 30.0
+# Wait this long before retrying a symbol whose refresh failed
+FAILURE_BACKOFF_SECONDS = 60.0
+# Every worker runs a prefetcher; a worker claiming a refresh holds the
+# symbol this long (well over a refresh), and the others check back after
+# MAX_IDLE_SECONDS for its results in the shared store
+LEASE_SECONDS = 120.0
+worker_id = str(os.getpid())
+
+prefetch_stats = {"refreshes": 0, "failures": 0, "skipped": 0, "last_symbol": None}
+retry_after = {}
+
+def hot_symbols():
+    """The N most requested symbols (recently, with headlines) that aren't on the watchlist."""
+    return [symbol for symbol, _ in cache.most_requested(top_n + len(watchlist), min_requests)
+            if symbol not in watchlist][:top_n]
+
+def tracked_symbols():
+    return watchlist + hot_symbols()
+
+def seconds_until_due(symbol, entry, now):
+    """Seconds until a symbol's entry is due for a refresh (0 if never cached)."""
+    due = 0.0 if entry is None else entry[0] + cache.cache_ttl - lead_seconds - now
+    return max(due, retry_after.get(symbol, 0.0) - now)
+
+async def next_due():
+    """
+    Find the tracked symbol whose entry lapses first.
+    
+    Returns:
+        (symbol, seconds until it is due for a refresh); symbols never
+        cached are due immediately
+    """
+    best = (None, MAX_IDLE_SECONDS)
+    now = time.time()
+    for symbol in tracked_symbols():
+        due = seconds_until_due(symbol, await cache.get_entry(symbol), now)
+        if due < best[1]:
+            best = (symbol, due)
+    return best
+
+async def claim(symbol):
+    """
+    Whether this worker should refresh a due symbol.
+    
+    Skips symbols another worker has already refreshed (their results are
+    picked up from the store) or is refreshing now (holds the lease).
+    """
+    if seconds_until_due(symbol, await cache.reload_entry(symbol), time.time()) > 0:
+        return False
+    if await asyncio.to_thread(store.claim_lease, f"prefetch:{symbol}", worker_id, LEASE_SECONDS):
+        return True
+    retry_after[symbol] = time.time() + MAX_IDLE_SECONDS
+    return False
+
+async def run_prefetcher():
+    """
+    Keep tracked symbols fresh until cancelled.
+    
+    Refreshes the most urgent symbol once it is within LEAD_SECONDS of
+    expiring, one at a time and at least MIN_INTERVAL_SECONDS apart, so
+    watchlist and hot symbols are always served from cache without bursts
+    of NewsAPI calls. Workers coordinate through the shared store, so each
+    symbol is refreshed by one of them.
+    """
+    print(f"Prefetcher started (watchlist: {watchlist or 'none'}, top {top_n}, "
+          f"lead {lead_seconds:.0f}s, min interval {min_interval}s)")
+    while True:
+        symbol, due_in = await next_due()
+        if symbol is None or due_in > 0:
+            await asyncio.sleep(min(max(due_in, 1.0), MAX_IDLE_SECONDS))
+            continue
+        if not await claim(symbol):
+            prefetch_stats["skipped"] += 1
+            continue
+    
+        try:
+            # Joins a refresh already started by a user request, if any
+            await asyncio.shield(cache.refresh_symbol(symbol))
+            prefetch_stats["refreshes"] += 1
+            retry_after.pop(symbol, None)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            prefetch_stats["failures"] += 1
+            retry_after[symbol] = time.time() + FAILURE_BACKOFF_SECONDS
+            print(f"Prefetch failed for {symbol}: {e}")
+        prefetch_stats["last_symbol"] = symbol
+        await asyncio.sleep(min_interval)
+
+def get_prefetch_stats():
+    return dict(
+        prefetch_stats,
+        enabled=enabled,
+        watchlist=watchlist,
+        hot=hot_symbols(),
+    )
@@ -1,4 +1,5 @@
 import os
+import httpx
 from dotenv import load_dotenv
 from newsapi import NewsApiClient
 
@@ -8,6 +9,31 @@ load_dotenv()
 # Initialize the News API client
 api = NewsApiClient(api_key=os.getenv("NEWSAPI_KEY"))
 
+# Async client settings; the base URL can point at a local stub for testing
+NEWSAPI_BASE_URL = os.getenv("NEWSAPI_BASE_URL", "https://newsapi.org/v2")
+NEWSAPI_TIMEOUT = float(os.getenv("NEWSAPI_TIMEOUT_SECONDS", 10))
+NEWSAPI_MAX_CONNECTIONS = int(os.getenv("NEWSAPI_MAX_CONNECTIONS", 10))
+
+# Shared keep-alive connection pool, created on first use in the event loop
+async_client = None
+
+# Define company names for better results
+company_names = {
+    'AAPL': 'Apple',
+    'MSFT': 'Microsoft',
+    'GOOGL': 'Google',
+    'AMZN': 'Amazon',
+    'META': 'Meta Facebook',
+    'TSLA': 'Tesla',
+    'NVDA': 'Nvidia',
+    # Add more mappings as needed
+}
+
+def build_query(symbol: str) -> str:
+    # Use company name if available, otherwise just use the symbol
+    company = company_names.get(symbol, symbol)
+    return f"{company} stock OR {symbol} stock"
+
 def fetch_headlines(symbol: str, page_size: int = 50):
     """
     Fetch news headlines for a given stock symbol.
@@ -20,20 +46,7 @@ def fetch_headlines(symbol: str, page_size: int = 50):
         List of article dictionaries with title, url, and publishedAt
     """
     # Construct search query - include company name for better results
-    company_names = {
-        'AAPL': 'Apple',
-        'MSFT': 'Microsoft',
-        'GOOGL': 'Google',
-        'AMZN': 'Amazon',
-        'META': 'Meta Facebook',
-        'TSLA': 'Tesla',
-        'NVDA': 'Nvidia',
-        # Add more mappings as needed
-    }
-    
-    # Use company name if available, otherwise just use the symbol
-    company = company_names.get(symbol, symbol)
-    query = f"{company} stock OR {symbol} stock"
+    query = build_query(symbol)
     
     # Call News API to fetch articles
     resp = api.get_everything(
@@ -46,6 +59,41 @@ def fetch_headlines(symbol: str, page_size: int = 50):
     # Return list of article dictionaries
     return resp.get("articles", [])
 
+async def fetch_headlines_async(symbol: str, page_size: int = 50):
+    """
+    Async version of fetch_headlines on a shared keep-alive connection pool.
+    
+    Raises:
+        httpx.HTTPError: On connection errors or a non-2xx response
+    """
+    global async_client
+    if async_client is None:
+        async_client = httpx.AsyncClient(
+            base_url=NEWSAPI_BASE_URL,
+            timeout=NEWSAPI_TIMEOUT,
+            limits=httpx.Limits(max_connections=NEWSAPI_MAX_CONNECTIONS),
+        )
+    
+    resp = await async_client.get(
+        "/everything",
+        params={
+            "q": build_query(symbol),
+            "language": "en",
+            "sortBy": "publishedAt",
+            "pageSize": page_size,
+            "apiKey": os.getenv("NEWSAPI_KEY"),
+        },
+    )
+    resp.raise_for_status()
+    return resp.json().get("articles", [])
+
+async def close_async_client():
+    """Close the shared connection pool (call on shutdown)."""
+    global async_client
+    if async_client is not None:
+        await async_client.aclose()
+        async_client = None
+
 if __name__ == "__main__":
     # Simple test to verify functionality
     import json
@@ -0,0 +1,138 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# SQLite file shared by every worker on the host (WAL mode allows concurrent
+# readers alongside a writer)
+db_path = os.getenv("SENTIMENT_DB_PATH", "sentiment_cache.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS symbol_results (
+    symbol TEXT PRIMARY KEY,
+    results TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS headlines (
+    key TEXT PRIMARY KEY,
+    label TEXT NOT NULL,
+    score REAL NOT NULL,
+    scored_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS headlines_scored_at ON headlines (scored_at);
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+# SQLite parameters per statement are limited; look keys up in chunks
+MAX_VARIABLES = 500
+
+# One connection per thread; sqlite3 connections can't be shared across threads
+_local = threading.local()
+
+def _connect():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        _local.conn = conn
+    return conn
+
+def get_symbol(symbol: str):
+    """
+    Get the stored results for a symbol.
+    
+    Returns:
+        (updated_at, results) or None if the symbol was never stored
+    """
+    row = _connect().execute(
+        "SELECT updated_at, results FROM symbol_results WHERE symbol = ?", (symbol,)
+    ).fetchone()
+    return (row[0], json.loads(row[1])) if row else None
+
+def put_symbol(symbol: str, results, updated_at: float):
+    """Store the results computed for a symbol at `updated_at` (epoch seconds)."""
+    conn = _connect()
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO symbol_results (symbol, results, updated_at) VALUES (?, ?, ?)",
+            (symbol, json.dumps(results), updated_at)
+        )
+
+def recent_symbols(since: float, limit: int):
+    """Symbols updated after `since`, oldest first, as (symbol, updated_at, results)."""
+    rows = _connect().execute(
+        "SELECT symbol, updated_at, results FROM symbol_results WHERE updated_at > ? "
+        "ORDER BY updated_at DESC LIMIT ?",
+        (since, limit)
+    ).fetchall()
+    return [(symbol, updated_at, json.loads(results)) for symbol, updated_at, results in reversed(rows)]
+
+def claim_lease(name: str, owner: str, seconds: float) -> bool:
+    """
+    Take (or renew) a named lease for `seconds` unless another owner holds it.
+    
+    Lets workers sharing the database agree on who does a job; an owner that
+    dies just lets its lease expire.
+    """
+    now = time.time()
+    conn = _connect()
+    with conn:
+        conn.execute(
+            "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE leases.expires_at < ? OR leases.owner = excluded.owner",
+            (name, owner, now + seconds, now)
+        )
+        row = conn.execute("SELECT owner FROM leases WHERE name = ?", (name,)).fetchone()
+    return row[0] == owner
+
+def get_headlines(keys):
+    """Get stored model outputs for headline keys, as a dict of key -> {"label", "score"}."""
+    conn = _connect()
+    found = {}
+    keys = list(keys)
+    for start in range(0, len(keys), MAX_VARIABLES):
+        chunk = keys[start:start + MAX_VARIABLES]
+        rows = conn.execute(
+            f"SELECT key, label, score FROM headlines WHERE key IN ({','.join('?' * len(chunk))})",
+            chunk
+        ).fetchall()
+        found.update((key, {"label": label, "score": score}) for key, label, score in rows)
+    return found
+
+def put_headlines(keys, results):
+    """Store model outputs for headline keys, stamped with the current time."""
+    now = time.time()
+    conn = _connect()
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO headlines (key, label, score, scored_at) VALUES (?, ?, ?, ?)",
+            [(key, result["label"], result["score"], now) for key, result in zip(keys, results)]
+        )
+
+def recent_headlines(limit: int):
+    """The most recently scored headlines, oldest first, as (key, result)."""
+    rows = _connect().execute(
+        "SELECT key, label, score FROM headlines ORDER BY scored_at DESC LIMIT ?", (limit,)
+    ).fetchall()
+    return [(key, {"label": label, "score": score}) for key, label, score in reversed(rows)]
+
+def prune(max_age_seconds: float):
+    """Delete rows older than `max_age_seconds`."""
+    cutoff = time.time() - max_age_seconds
+    conn = _connect()
+    with conn:
+        conn.execute("DELETE FROM symbol_results WHERE updated_at < ?", (cutoff,))
+        conn.execute("DELETE FROM headlines WHERE scored_at < ?", (cutoff,))
+        conn.execute("DELETE FROM leases WHERE expires_at < ?", (time.time(),))